@@ -0,0 +1,108 @@
+"""refresh session family_id and rotated tokens
+
+Revision ID: 3c9a1f62d8b7
+Revises: b73e0c52d1a4
+Create Date: 2026-10-18 21:40:52.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1f62d8b7'
+down_revision: Union[str, None] = 'b73e0c52d1a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    op.add_column(
+        'auth_refresh_session',
+        sa.Column('family_id', sa.UUID(), nullable=True),
+    )
+    # covers pods still running the previous release, set after adding
+    # the column so existing rows are filled in batches below
+    op.alter_column(
+        'auth_refresh_session',
+        'family_id',
+        server_default=sa.text('gen_random_uuid()'),
+    )
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        while True:
+            updated = bind.execute(
+                sa.text(
+                    "UPDATE auth_refresh_session "
+                    "SET family_id = gen_random_uuid() "
+                    "WHERE id IN ("
+                    "SELECT id FROM auth_refresh_session "
+                    "WHERE family_id IS NULL LIMIT :batch_size)"
+                ),
+                {"batch_size": BACKFILL_BATCH_SIZE},
+            ).rowcount
+            if not updated:
+                break
+    op.alter_column('auth_refresh_session', 'family_id', nullable=False)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_auth_refresh_session_family_id'),
+            'auth_refresh_session',
+            ['family_id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+    op.create_table(
+        'auth_refresh_rotated',
+        sa.Column('refresh_token', sa.UUID(), nullable=False),
+        sa.Column('family_id', sa.UUID(), nullable=False),
+        sa.Column('expires_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('refresh_token'),
+    )
+    op.create_index(
+        op.f('ix_auth_refresh_rotated_family_id'),
+        'auth_refresh_rotated',
+        ['family_id'],
+        unique=False,
+    )
+    op.create_index(
+        op.f('ix_auth_refresh_rotated_expires_at'),
+        'auth_refresh_rotated',
+        ['expires_at'],
+        unique=False,
+    )
+    # the one level of history previous_refresh_token kept
+    op.execute(
+        "INSERT INTO auth_refresh_rotated "
+        "(refresh_token, family_id, expires_at) "
+        "SELECT previous_refresh_token, family_id, expires_at "
+        "FROM auth_refresh_session "
+        "WHERE previous_refresh_token IS NOT NULL "
+        "ON CONFLICT DO NOTHING"
+    )
+    # previous_refresh_token stays until no pod of the previous release
+    # writes it, a later revision drops it
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_auth_refresh_rotated_expires_at'),
+        table_name='auth_refresh_rotated',
+    )
+    op.drop_index(
+        op.f('ix_auth_refresh_rotated_family_id'),
+        table_name='auth_refresh_rotated',
+    )
+    op.drop_table('auth_refresh_rotated')
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_auth_refresh_session_family_id'),
+            table_name='auth_refresh_session',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('auth_refresh_session', 'family_id')
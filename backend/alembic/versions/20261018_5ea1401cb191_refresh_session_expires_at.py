@@ -0,0 +1,76 @@
+"""refresh session expires_at
+
+Revision ID: 5ea1401cb191
+Revises: 8f4fcf7f7be3
+Create Date: 2026-10-18 14:03:27.540918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.app_config.app_settings import app_settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5ea1401cb191'
+down_revision: Union[str, None] = '8f4fcf7f7be3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    op.add_column(
+        'auth_refresh_session',
+        sa.Column('expires_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+    # pods still running the previous release insert without expires_at,
+    # set only after adding the column so existing rows stay NULL and get
+    # their exact value from the backfill
+    op.alter_column(
+        'auth_refresh_session',
+        'expires_at',
+        server_default=sa.text(
+            f"now() + interval "
+            f"'{app_settings.REFRESH_TOKEN_EXPIRE_DAYS} days'"
+        ),
+    )
+    # short transactions, so row locks don't pile up behind one UPDATE
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        while True:
+            updated = bind.execute(
+                sa.text(
+                    "UPDATE auth_refresh_session "
+                    "SET expires_at = "
+                    "created_at + expires_in * interval '1 second' "
+                    "WHERE id IN ("
+                    "SELECT id FROM auth_refresh_session "
+                    "WHERE expires_at IS NULL LIMIT :batch_size)"
+                ),
+                {"batch_size": BACKFILL_BATCH_SIZE},
+            ).rowcount
+            if not updated:
+                break
+    op.alter_column('auth_refresh_session', 'expires_at', nullable=False)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_auth_refresh_session_expires_at'),
+            'auth_refresh_session',
+            ['expires_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_auth_refresh_session_expires_at'),
+            table_name='auth_refresh_session',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('auth_refresh_session', 'expires_at')
@@ -0,0 +1,38 @@
+"""auth_user keyset index
+
+Revision ID: 8f4fcf7f7be3
+Revises: 467797362605
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f4fcf7f7be3'
+down_revision: Union[str, None] = '467797362605'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_auth_user_creation_date_id',
+            'auth_user',
+            ['creation_date', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_auth_user_creation_date_id',
+            table_name='auth_user',
+            postgresql_concurrently=True,
+        )
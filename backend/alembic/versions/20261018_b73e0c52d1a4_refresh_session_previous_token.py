@@ -0,0 +1,43 @@
+"""refresh session previous_refresh_token
+
+Revision ID: b73e0c52d1a4
+Revises: 5ea1401cb191
+Create Date: 2026-10-18 15:21:08.114306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b73e0c52d1a4'
+down_revision: Union[str, None] = '5ea1401cb191'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'auth_refresh_session',
+        sa.Column('previous_refresh_token', sa.UUID(), nullable=True),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_auth_refresh_session_previous_refresh_token'),
+            'auth_refresh_session',
+            ['previous_refresh_token'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_auth_refresh_session_previous_refresh_token'),
+            table_name='auth_refresh_session',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('auth_refresh_session', 'previous_refresh_token')
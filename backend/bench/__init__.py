@@ -0,0 +1,6 @@
+"""
+Standalone benchmarks, run from backend/ as `python -m bench.<name>`.
+They need the project's dependencies but no database or Redis unless the
+module says otherwise. Modules importing app settings read the same
+environment (.env) as the app
+"""
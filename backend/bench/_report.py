@@ -0,0 +1,29 @@
+import timeit
+from typing import Callable, Iterable, Sequence
+
+
+def per_call_us(func: Callable[[], object], number: int, repeat: int = 5):
+    """Best of `repeat` runs of `number` calls, microseconds per call"""
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return best / number * 1e6
+
+
+def print_table(headers: Sequence[str], rows: Iterable[Sequence]) -> None:
+    rows = [[_cell(value) for value in row] for row in rows]
+    widths = [
+        max([len(header)] + [len(row[i]) for row in rows])
+        for i, header in enumerate(headers)
+    ]
+    line = "  ".join(f"{{:>{w}}}" for w in widths)
+    print(line.format(*headers))
+    print(line.format(*("-" * w for w in widths)))
+    for row in rows:
+        print(line.format(*row))
+
+
+def _cell(value) -> str:
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
@@ -0,0 +1,130 @@
+"""
+Peak RSS of exporting --rows users: ExportService.stream_table fed by a
+fake cursor yielding EXPORT_FETCH_SIZE partitions, versus loading every
+row first and encoding them at once. Each case runs in its own process,
+so the peaks don't mix. Rows are generated, no database needed; the
+server-side cursor's own memory lives in Postgres and isn't measured:
+
+    python -m bench.export_rss [--rows 1000000]
+"""
+import argparse
+import asyncio
+import resource
+import subprocess
+import sys
+import uuid
+from datetime import date
+
+from src.app.services.export import ENCODERS, ExportService
+
+from ._report import print_table
+
+
+CASES = [
+    (mode, export_format)
+    for mode in ("streamed", "loaded")
+    for export_format in ("ndjson", "csv")
+]
+
+
+def _row(i: int) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "login": f"user_{i}",
+        "role": "ClientRole",
+        "is_active": True,
+        "creation_date": date(2026, 10, 18),
+    }
+
+
+class FakeCursor:
+    def __init__(self, rows: int):
+        self._rows = rows
+
+    async def stream_rows(self, fetch_size: int):
+        for start in range(0, self._rows, fetch_size):
+            stop = min(start + fetch_size, self._rows)
+            yield [_row(i) for i in range(start, stop)]
+
+
+class FakeUnitOfWork:
+    async def __aenter__(self) -> "FakeUnitOfWork":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+def _peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _streamed(rows: int, export_format: str) -> int:
+    sent = 0
+    chunks = ExportService.stream_table(
+        FakeUnitOfWork(), lambda uow: FakeCursor(rows), export_format
+    )
+    async for chunk in chunks:
+        sent += len(chunk)  # handed to the socket and dropped
+    return sent
+
+
+async def _loaded(rows: int, export_format: str) -> int:
+    everything = [_row(i) for i in range(rows)]
+    return len(ENCODERS[export_format](everything, True))
+
+
+def child(mode: str, export_format: str, rows: int) -> None:
+    run = _streamed if mode == "streamed" else _loaded
+    # the interpreter and imports, not part of the export
+    before = _peak_mb()
+    sent = asyncio.run(run(rows, export_format))
+    print(before, _peak_mb(), sent)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "FORMAT"))
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.rows)
+        return
+
+    table = []
+    for mode, export_format in CASES:
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "bench.export_rss",
+                "--rows",
+                str(args.rows),
+                "--child",
+                mode,
+                export_format,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        before, peak, sent = float(output[0]), float(output[1]), output[2]
+        table.append(
+            [mode, export_format, int(sent), before, peak, peak - before]
+        )
+    print_table(
+        [
+            "export",
+            "format",
+            "bytes",
+            "rss before, MB",
+            "peak rss, MB",
+            "growth, MB",
+        ],
+        table,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+POST /user/list serialization at 100, 1k and 10k rows, from row mappings
+to response body. "validated" is the path before orjson: a pydantic
+validation per row, FastAPI's response_model validation and dump, then
+JSONResponse. "constructed" is the current one: construct_all() and
+model_response(). No database needed:
+
+    python -m bench.list_serialization [--sizes 100 1000 10000]
+"""
+import argparse
+import timeit
+import uuid
+from datetime import date
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from src.app.schemas.auth import UserPublic
+from src.app.schemas.types import UserRole
+from src.app.utils.repository import SQLAlchemyRepository
+from src.app.utils.responses import model_response
+
+from ._report import print_table
+
+
+RESPONSE_MODEL = TypeAdapter(list[UserPublic])
+
+
+def rows(count: int) -> list[dict]:
+    """What result.mappings() yields for export_columns"""
+    return [
+        {
+            "id": uuid.uuid4(),
+            "login": f"user_{i}",
+            "role": UserRole.ClientRole,
+            "is_active": True,
+            "creation_date": date(2026, 10, 18),
+        }
+        for i in range(count)
+    ]
+
+
+def validated(mappings: list[dict]) -> bytes:
+    items = [UserPublic.model_validate(row) for row in mappings]
+    checked = RESPONSE_MODEL.validate_python(items, from_attributes=True)
+    return JSONResponse(RESPONSE_MODEL.dump_python(checked, mode="json")).body
+
+
+def constructed(mappings: list[dict]) -> bytes:
+    items = SQLAlchemyRepository.construct_all(UserPublic, mappings)
+    return model_response(items).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 10000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    table = []
+    for size in args.sizes:
+        mappings = rows(size)
+        number = max(1, 10000 // size)
+        timings = {}
+        for serialize in (validated, constructed):
+            best = min(
+                timeit.repeat(
+                    lambda: serialize(mappings),
+                    number=number,
+                    repeat=args.repeat,
+                )
+            )
+            timings[serialize.__name__] = best / number * 1000
+        table.append(
+            [
+                size,
+                timings["validated"],
+                timings["constructed"],
+                timings["validated"] / timings["constructed"],
+                len(constructed(mappings)),
+            ]
+        )
+    print_table(
+        ["rows", "validated, ms", "constructed, ms", "speedup", "bytes"],
+        table,
+    )
+
+
+if __name__ == "__main__":
+    main()
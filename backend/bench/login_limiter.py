@@ -0,0 +1,65 @@
+"""
+CPU the app spends per login attempt: rejected by the limiter's local
+block, versus let through to one bcrypt verify at the cost the app hashes
+with. Redis round-trips are not included, only in-process CPU:
+
+    python -m bench.login_limiter [--number 20000]
+"""
+import argparse
+import asyncio
+import time
+
+import bcrypt
+
+from src.app.repositories.exceptions import TooManyLoginAttemptsException
+from src.app.utils.login_limiter import LoginRateLimiter
+from src.app.utils.static.auth_crypto import PasswordStatic
+
+from ._report import print_table
+
+
+PASSWORD = "benchmark-password"
+
+
+async def _rejected_locally(number: int) -> float:
+    limiter = LoginRateLimiter(
+        per_login=1, per_ip=1, window=60, local_size=10000
+    )
+    limiter._block(dict.fromkeys(limiter._keys("alice", "10.0.0.1"), 60))
+    started = time.process_time()
+    for _ in range(number):
+        try:
+            await limiter.check("alice", "10.0.0.1")
+        except TooManyLoginAttemptsException:
+            pass
+    return (time.process_time() - started) / number * 1e6
+
+
+def _bcrypt_verify(number: int) -> float:
+    hashed = PasswordStatic._hash_password(PASSWORD)
+    started = time.process_time()
+    for _ in range(number):
+        PasswordStatic._verify_password(PASSWORD, hashed)
+    return (time.process_time() - started) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    number = parser.parse_args().number
+
+    rejected = asyncio.run(_rejected_locally(number))
+    # a handful is enough at ~100 ms each
+    verified = _bcrypt_verify(max(1, number // 2000))
+    rounds = bcrypt.gensalt()[4:6].decode()
+    print_table(
+        ["path", "cpu per attempt, us", "share of bcrypt"],
+        [
+            ["rejected locally", rejected, f"1/{verified / rejected:,.0f}"],
+            [f"bcrypt verify, cost {rounds}", verified, "1"],
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Pool occupancy of concurrent logins when the connection is held through
+bcrypt versus released before it, as login_user does. The pool is a
+semaphore of --pool-size slots and each statement sleeps --rtt-ms, bcrypt
+runs for real on --workers threads. No database needed:
+
+    python -m bench.login_pool [--logins 200] [--pool-size 5]
+"""
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import bcrypt
+
+from ._report import print_table
+
+
+PASSWORD = b"benchmark-password"
+
+
+class Pool:
+    def __init__(self, size: int):
+        self._slots = asyncio.Semaphore(size)
+        self.held = 0.0
+        self.waited = 0.0
+
+    @asynccontextmanager
+    async def connection(self):
+        loop = asyncio.get_running_loop()
+        asked = loop.time()
+        async with self._slots:
+            got = loop.time()
+            self.waited += got - asked
+            try:
+                yield
+            finally:
+                self.held += loop.time() - got
+
+
+async def _statements(count: int, rtt: float) -> None:
+    for _ in range(count):
+        await asyncio.sleep(rtt)
+
+
+async def _verify(executor, hashed: bytes) -> None:
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, bcrypt.checkpw, PASSWORD, hashed)
+
+
+async def held_through_bcrypt(pool, executor, hashed, rtt) -> None:
+    async with pool.connection():
+        await _statements(2, rtt)  # BEGIN, SELECT
+        await _verify(executor, hashed)
+        await _statements(2, rtt)  # INSERT, COMMIT
+
+
+async def released_for_bcrypt(pool, executor, hashed, rtt) -> None:
+    async with pool.connection():
+        await _statements(3, rtt)  # BEGIN, SELECT, ROLLBACK
+    await _verify(executor, hashed)
+    async with pool.connection():
+        await _statements(3, rtt)  # BEGIN, INSERT, COMMIT
+
+
+async def _run(login, args, hashed) -> list:
+    pool = Pool(args.pool_size)
+    rtt = args.rtt_ms / 1000
+    with ThreadPoolExecutor(args.workers) as executor:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                login(pool, executor, hashed, rtt)
+                for _ in range(args.logins)
+            )
+        )
+        wall = time.perf_counter() - started
+    return [
+        login.__name__,
+        args.logins / wall,
+        pool.held / args.logins * 1000,
+        pool.waited / args.logins * 1000,
+        pool.held / (args.pool_size * wall) * 100,
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    hashed = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(args.rounds))
+    rows = [
+        asyncio.run(_run(login, args, hashed))
+        for login in (held_through_bcrypt, released_for_bcrypt)
+    ]
+    print_table(
+        [
+            "login",
+            "logins/s",
+            "held per login, ms",
+            "checkout wait, ms",
+            "pool busy, %",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Latency of non-auth requests while a storm of logins verifies passwords,
+with bcrypt inline on the event loop (before) and in password_pool
+(after). GET /api/metrics is sent through the app in-process every
+--probe-interval ms for as long as the storm lasts. It reads no database,
+so only the app's settings are needed:
+
+    python -m bench.login_storm [--logins 32] [--rounds 12]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import bcrypt
+import httpx
+
+from src.app.schemas.auth import UserRole
+from src.app.utils.static.auth_crypto import PasswordStatic, TokenUtils
+from src.app.utils.static.password_pool import password_pool
+from src.main import app
+
+from ._report import print_table
+
+
+PASSWORD = "benchmark-password"
+
+
+async def no_logins(hashed: str) -> None:
+    await asyncio.sleep(0)
+
+
+async def inline(hashed: str) -> None:
+    PasswordStatic._verify_password(PASSWORD, hashed)
+
+
+async def pooled(hashed: str) -> None:
+    await PasswordStatic.is_valid_password(PASSWORD, hashed)
+
+
+async def _probe(client, latencies: list, interval: float, done) -> None:
+    while not done.is_set():
+        started = time.perf_counter()
+        response = await client.get("/api/metrics")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+
+async def _measure(client, login, hashed, args) -> list:
+    latencies, done = [], asyncio.Event()
+    probe = asyncio.create_task(
+        _probe(client, latencies, args.probe_interval / 1000, done)
+    )
+    await asyncio.sleep(args.probe_interval / 1000)
+    started = time.perf_counter()
+    await asyncio.gather(*(login(hashed) for _ in range(args.logins)))
+    storm = time.perf_counter() - started
+    # the baseline has no storm to outlast, give it a few probes
+    await asyncio.sleep(max(0.0, 0.2 - storm))
+    done.set()
+    await probe
+
+    latencies.sort()
+    return [
+        login.__name__,
+        len(latencies),
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.99)] * 1000,
+        latencies[-1] * 1000,
+    ]
+
+
+async def _run(args) -> list:
+    hashed = bcrypt.hashpw(
+        PASSWORD.encode(), bcrypt.gensalt(args.rounds)
+    ).decode()
+    token = TokenUtils.create_access_token(
+        uuid.uuid4(), UserRole.SuperUserRole, True
+    )
+    password_pool.start()
+    try:
+        # spawn the pool's workers before timing anything
+        await pooled(hashed)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="https://bench",
+            cookies={"access_token": f"Bearer {token}"},
+        ) as client:
+            return [
+                await _measure(client, login, hashed, args)
+                for login in (no_logins, inline, pooled)
+            ]
+    finally:
+        password_pool.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--probe-interval", type=float, default=10)
+    args = parser.parse_args()
+
+    print_table(
+        ["bcrypt", "requests", "p50, ms", "p99, ms", "max, ms"],
+        asyncio.run(_run(args)),
+    )
+
+
+if __name__ == "__main__":
+    main()
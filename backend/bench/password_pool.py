@@ -0,0 +1,99 @@
+"""
+bcrypt verify inline on the event loop versus through password_pool.
+For each, --concurrency verifies run at once while a ticker measures how
+late the loop wakes it up, which is what every other request on the
+worker would wait. No database needed:
+
+    python -m bench.password_pool [--concurrency 16] [--rounds 12]
+"""
+import argparse
+import asyncio
+import time
+
+import bcrypt
+
+from src.app.utils.static.password_pool import PasswordPool
+
+from ._report import print_table
+
+
+PASSWORD = b"benchmark-password"
+TICK = 0.005
+
+
+async def _ticker(lags: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK
+        await asyncio.sleep(TICK)
+        lags.append(loop.time() - expected)
+
+
+async def inline(hashed: bytes, pool: PasswordPool) -> bool:
+    return bcrypt.checkpw(PASSWORD, hashed)
+
+
+async def through_pool(hashed: bytes, pool: PasswordPool) -> bool:
+    return await pool.run(bcrypt.checkpw, PASSWORD, hashed)
+
+
+async def _measure(verify, hashed, pool, concurrency) -> list:
+    lags, stop = [], asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    await asyncio.sleep(TICK * 2)
+
+    started = time.perf_counter()
+    await verify(hashed, pool)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await asyncio.gather(*(verify(hashed, pool) for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    return [
+        verify.__name__,
+        single * 1000,
+        concurrency / wall,
+        max(lags) * 1000,
+    ]
+
+
+async def _run(args) -> list:
+    hashed = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(args.rounds))
+    pool = PasswordPool(workers=args.workers, max_queue=args.concurrency)
+    pool.start()
+    try:
+        # spawn the workers before timing anything
+        await asyncio.gather(
+            *(through_pool(hashed, pool) for _ in range(pool._workers))
+        )
+        return [
+            await _measure(verify, hashed, pool, args.concurrency)
+            for verify in (inline, through_pool)
+        ]
+    finally:
+        pool.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    print_table(
+        [
+            "verify",
+            "one verify, ms",
+            "verifies/s",
+            "worst loop lag, ms",
+        ],
+        asyncio.run(_run(args)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Payload size and encode/decode time of the RedisRepository codecs
+against the plain pickle it used before. No Redis needed:
+
+    python -m bench.redis_codecs [--number 20000]
+"""
+import argparse
+import pickle
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pydantic import BaseModel
+
+from src.app.schemas.auth import AuthTokenORMSchema, Token, User
+from src.app.schemas.types import UserRole
+from src.app_config.redis_codecs import build_serializer
+
+from ._report import per_call_us, print_table
+
+
+def samples() -> dict[str, BaseModel]:
+    now = datetime.now(timezone.utc)
+    return {
+        "User": User(
+            id=uuid.uuid4(),
+            login="benchmark_user",
+            role=UserRole.OrgManagerRole,
+            is_active=True,
+        ),
+        "AuthTokenORMSchema": AuthTokenORMSchema(
+            id=1,
+            user_id=uuid.uuid4(),
+            refresh_token=uuid.uuid4(),
+            expires_in=2592000,
+            created_at=now,
+            expires_at=now + timedelta(days=30),
+        ),
+        "Token": Token(
+            access_token="e" * 220,  # about the size of our access JWT
+            refresh_token=uuid.uuid4(),
+            token_type="bearer",
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    number = parser.parse_args().number
+
+    candidates = {
+        "pickle (before)": (pickle.dumps, pickle.loads),
+    }
+    for codec in ("orjson", "msgpack"):
+        serializer = build_serializer(codec, 0)
+        candidates[codec] = (serializer.dumps, serializer.loads)
+        compressed = build_serializer(codec, 1)
+        candidates[f"{codec}+zlib"] = (compressed.dumps, compressed.loads)
+
+    rows = []
+    for name, obj in samples().items():
+        for codec, (dumps, loads) in candidates.items():
+            payload = dumps(obj)
+            assert loads(payload) == obj
+            rows.append(
+                [
+                    name,
+                    codec,
+                    len(payload),
+                    per_call_us(lambda: dumps(obj), number),
+                    per_call_us(lambda: loads(payload), number),
+                ]
+            )
+    print_table(
+        ["model", "codec", "bytes", "encode, us", "decode, us"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
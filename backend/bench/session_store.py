@@ -0,0 +1,98 @@
+"""
+Refresh throughput of the SQL and Redis session stores: --concurrency
+sessions of one user rotate their refresh token --rounds times each,
+one UnitOfWork per rotation as in UserService.refresh_token. Needs the
+database and Redis from the app's settings and an existing user; the
+sessions it creates are deleted afterwards. Keep --concurrency within
+the pool (DB__DB_POOL_SIZE + DB__DB_MAX_OVERFLOW per worker), or the
+SQL run measures pool timeouts:
+
+    python -m bench.session_store --user-id UUID [--concurrency 10]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from src.app_config.app_settings import app_settings
+from src.app.schemas.auth import RefreshSessionCreate
+from src.app.utils.unitofwork import UnitOfWork
+from src.redisrepo.dependencies import redis_manager
+
+from ._report import print_table
+
+
+TTL = 3600
+
+
+async def _login(user_id: uuid.UUID) -> uuid.UUID:
+    refresh_token = uuid.uuid4()
+    async with UnitOfWork() as uow:
+        await uow.token.add_token(
+            RefreshSessionCreate(
+                refresh_token=refresh_token, expires_in=TTL, user_id=user_id
+            )
+        )
+        await uow.commit()
+    return refresh_token
+
+
+async def _rotate_chain(refresh_token: uuid.UUID, rounds: int) -> None:
+    for _ in range(rounds):
+        new_refresh_token = uuid.uuid4()
+        async with UnitOfWork() as uow:
+            rotation = await uow.token.rotate_token(
+                str(refresh_token), new_refresh_token, TTL
+            )
+            await uow.commit()
+        assert rotation is not None
+        refresh_token = new_refresh_token
+
+
+async def _cleanup(user_id: uuid.UUID) -> None:
+    async with UnitOfWork() as uow:
+        await uow.token.delete_all_tokens_by_user_id(user_id)
+        await uow.commit()
+
+
+async def _measure(backend: str, args) -> list:
+    app_settings.SESSION_STORE_BACKEND = backend
+    tokens = await asyncio.gather(
+        *(_login(args.user_id) for _ in range(args.concurrency))
+    )
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(_rotate_chain(token, args.rounds) for token in tokens)
+    )
+    elapsed = time.perf_counter() - started
+    await _cleanup(args.user_id)
+
+    rotations = args.concurrency * args.rounds
+    return [backend, rotations, rotations / elapsed, elapsed / args.rounds]
+
+
+async def _run(args) -> list:
+    await redis_manager.start()
+    try:
+        return [
+            await _measure(backend, args) for backend in ("sql", "redis")
+        ]
+    finally:
+        await redis_manager.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user-id", type=uuid.UUID, required=True)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = asyncio.run(_run(args))
+    print_table(
+        ["store", "rotations", "rotations/s", "seconds per round"], rows
+    )
+
+
+if __name__ == "__main__":
+    main()
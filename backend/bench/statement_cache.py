@@ -0,0 +1,79 @@
+"""
+find_one_or_none_user(login=...) in the direct and pgbouncer connection
+modes. Each query gets its own session, as a request would. Needs the
+database from the app's DB__ settings, and for pgbouncer mode a PgBouncer
+in transaction mode in front of it:
+
+    python -m bench.statement_cache [--number 5000]
+        [--pgbouncer-host HOST] [--pgbouncer-port PORT]
+"""
+import argparse
+import asyncio
+import time
+
+from src.app_config.config_db import DBSettings, db_settings
+from src.app.repositories.metauser.auth_user import AuthRepository
+from src.database.db_accessor import DatabaseAccessor
+
+from ._report import print_table
+
+
+async def _measure(settings: DBSettings, login: str, number: int) -> list:
+    accessor = DatabaseAccessor(
+        settings, statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE
+    )
+    accessor.new_run()
+    try:
+
+        async def query() -> None:
+            async with accessor.get_session() as session:
+                await AuthRepository(session).find_one_or_none_user(
+                    login=login
+                )
+
+        # connect and prepare before timing
+        for _ in range(10):
+            await query()
+        started = time.perf_counter()
+        for _ in range(number):
+            await query()
+        elapsed = time.perf_counter() - started
+    finally:
+        await accessor.stop()
+    return [
+        settings.DB_CONNECTION_MODE,
+        f"{settings.HOST}:{settings.PORT}",
+        elapsed / number * 1e6,
+        number / elapsed,
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=5000)
+    parser.add_argument("--login", default="benchmark_user")
+    parser.add_argument("--pgbouncer-host", default=db_settings.HOST)
+    parser.add_argument("--pgbouncer-port", default=db_settings.PORT)
+    args = parser.parse_args()
+
+    base = db_settings.model_dump(exclude={"REPLICA_HOSTS"})
+    modes = [
+        DBSettings(**{**base, "DB_CONNECTION_MODE": "direct"}),
+        DBSettings(
+            **{
+                **base,
+                "DB_CONNECTION_MODE": "pgbouncer",
+                "HOST": args.pgbouncer_host,
+                "PORT": str(args.pgbouncer_port),
+            }
+        ),
+    ]
+    rows = [
+        asyncio.run(_measure(settings, args.login, args.number))
+        for settings in modes
+    ]
+    print_table(["mode", "server", "per query, us", "queries/s"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,4 +9,8 @@ if __name__ == "__main__":
         host=app_settings.HOST,
         port=app_settings.PORT,
         workers=app_settings.WORKERS,
+        # request.client is the proxy otherwise, and the login limiter
+        # would count every user behind it as one IP
+        proxy_headers=True,
+        forwarded_allow_ips=app_settings.FORWARDED_ALLOW_IPS,
     )
@@ -1,17 +1,18 @@
 from typing import Union
-from urllib import response
 
 import wtforms
-from fastapi.openapi.models import Response
 
 from sqladmin import Admin
 from sqladmin import ModelView
 from sqladmin.authentication import AuthenticationBackend
-from fastapi import Request, Response
+from fastapi import HTTPException, Request, Response
 
 
+from src.app.repositories.exceptions import TooManyLoginAttemptsException
 from src.app.schemas.types import UserRole
 from src.app.services.user import UserService
+from src.app.utils.static.auth_crypto import AuthContext
+from src.app.utils.unitofwork import UnitOfWork
 from src.database.all_models import (
     ClientORM,
     UserORM,
@@ -25,17 +26,25 @@ class MyBackend(AuthenticationBackend):
         form = await request.form()
         username, password = form["username"], form["password"]
 
-        token = await UserService.login_user(response, username, password)
-        
-        if not token:
+        try:
+            token = await UserService.login_user(
+                Response(),
+                username,
+                password,
+                UnitOfWork(),
+                # X-Forwarded-For applied by uvicorn, see FORWARDED_ALLOW_IPS
+                client_ip=request.client.host if request.client else None,
+            )
+            user = AuthContext.from_token(request, token.access_token)
+        except TooManyLoginAttemptsException as exc:
+            return exc.detail
+        except HTTPException:
             return "Invalid username or password"
-        
-        user = await UserService.get_user_by_id(token.user_id)
-        
+
         if user.role != UserRole.SuperUserRole:
             return "User is not a Super User"
 
-        request.session["token"] = "token.access_token"
+        request.session["token"] = token.access_token
         return True
 
     async def logout(self, request: Request) -> Union[bool, str]:
@@ -43,7 +52,14 @@ class MyBackend(AuthenticationBackend):
         return "Logged out successfully"
 
     async def authenticate(self, request: Request) -> bool:
-        return "token" in request.session
+        token = request.session.get("token")
+        if not token:
+            return False
+        try:
+            user = AuthContext.from_token(request, token)
+        except HTTPException:
+            return False
+        return user.role == UserRole.SuperUserRole and user.is_active
 
 
 class BaseModelView(ModelView):
@@ -91,6 +107,7 @@ class TokenAdmin(BaseModelView, model=AuthTokenORM):
         AuthTokenORM.refresh_token,
         AuthTokenORM.expires_in,
         AuthTokenORM.created_at,
+        AuthTokenORM.expires_at,
     ]
 
 
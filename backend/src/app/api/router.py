@@ -3,8 +3,12 @@ from src.app_config.config_api import settings
 
 from .v1.auth import router as auth_v1
 from .v1.user import router as user_v1
+from .v1.metrics import router as metrics_v1
+from .v1.export import router as export_v1
 
 router = APIRouter(prefix=settings.APP_PREFIX)
 
 router.include_router(auth_v1)
-router.include_router(user_v1)
\ No newline at end of file
+router.include_router(user_v1)
+router.include_router(metrics_v1)
+router.include_router(export_v1)
\ No newline at end of file
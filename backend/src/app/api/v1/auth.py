@@ -1,32 +1,43 @@
 from fastapi import APIRouter, Depends, Response, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from src.app.schemas.auth import (
-    User,
     UserCreate,
+    UserPublic,
     Token,
     AuthTokenORMSchema,
     UserRole,
 )
 from src.app.services.user import UserService
 from src.app.utils.static.auth_crypto import role_access, role_active_access
+from src.app.utils.unitofwork import IUnitOfWork, get_uow
 
 
 router = APIRouter(prefix="/auth", tags=["Authorisation"])
 
 
 @router.post(
-    "/register", status_code=status.HTTP_201_CREATED, response_model=User
+    "/register",
+    status_code=status.HTTP_201_CREATED,
+    response_model=UserPublic,
 )
-async def register(user: UserCreate):
-    return await UserService.register_new_user(user)
+async def register(user: UserCreate, uow: IUnitOfWork = Depends(get_uow)):
+    return await UserService.register_new_user(user, uow)
 
 
 @router.post("/login")
 async def login(
-    response: Response, credentials: OAuth2PasswordRequestForm = Depends()
+    request: Request,
+    response: Response,
+    credentials: OAuth2PasswordRequestForm = Depends(),
+    uow: IUnitOfWork = Depends(get_uow),
 ):
     return await UserService.login_user(
-        response, credentials.username, credentials.password
+        response,
+        credentials.username,
+        credentials.password,
+        uow,
+        # X-Forwarded-For applied by uvicorn, see FORWARDED_ALLOW_IPS
+        client_ip=request.client.host if request.client else None,
     )
 
 
@@ -34,14 +45,19 @@ async def login(
 async def logout(
     request: Request,
     response: Response,
+    uow: IUnitOfWork = Depends(get_uow),
 ):
-    await UserService.logout(response, request)
+    await UserService.logout(response, request, uow)
     return {"message": "Logged out successfully"}
 
 
 @router.post("/refresh")
-async def refresh_token(request: Request, response: Response) -> Token:
-    return await UserService.refresh_token(response, request)
+async def refresh_token(
+    request: Request,
+    response: Response,
+    uow: IUnitOfWork = Depends(get_uow),
+) -> Token:
+    return await UserService.refresh_token(response, request, uow)
 
 
 @router.post("/abort")
@@ -51,5 +67,6 @@ async def refresh_token(request: Request, response: Response) -> Token:
 async def abort_all_sessions(
     request: Request,
     response: Response,
+    uow: IUnitOfWork = Depends(get_uow),
 ) -> list[AuthTokenORMSchema]:
-    return await UserService.abort_all_sessions(response, request)
\ No newline at end of file
+    return await UserService.abort_all_sessions(response, request, uow)
\ No newline at end of file
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from src.app.schemas.auth import UserRole
+from src.app.services.export import MEDIA_TYPES, ExportFormat, ExportService
+from src.app.utils.static.auth_crypto import role_active_access
+from src.app.utils.unitofwork import IUnitOfWork, get_read_uow
+
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+def _attachment(name: str, export_format: ExportFormat) -> dict[str, str]:
+    return {
+        "Content-Disposition": f'attachment; filename="{name}.{export_format}"'
+    }
+
+
+@router.get("/users")
+@role_active_access({UserRole.SuperUserRole})
+async def export_users(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    uow: IUnitOfWork = Depends(get_read_uow),
+) -> StreamingResponse:
+    await ExportService.check_caller(request, uow)
+    return StreamingResponse(
+        ExportService.export_users(uow, format),
+        media_type=MEDIA_TYPES[format],
+        headers=_attachment("users", format),
+    )
+
+
+@router.get("/clients")
+@role_active_access({UserRole.SuperUserRole})
+async def export_clients(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    uow: IUnitOfWork = Depends(get_read_uow),
+) -> StreamingResponse:
+    await ExportService.check_caller(request, uow)
+    return StreamingResponse(
+        ExportService.export_clients(uow, format),
+        media_type=MEDIA_TYPES[format],
+        headers=_attachment("clients", format),
+    )
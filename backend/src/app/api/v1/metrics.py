@@ -0,0 +1,15 @@
+from typing import Any
+
+from fastapi import APIRouter, Request
+from src.app.schemas.auth import UserRole
+from src.app.utils.metrics import metrics
+from src.app.utils.static.auth_crypto import role_active_access
+
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("")
+@role_active_access({UserRole.SuperUserRole})
+async def get_metrics(request: Request) -> dict[str, dict[str, Any]]:
+    return metrics.collect()
@@ -2,27 +2,64 @@ from typing import List, Optional
 import uuid
 
 from fastapi import APIRouter, Depends, Response, Request, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from src.app.schemas.auth import User, UserUpdate, UsersFindRequest, UserRole
+from src.app.schemas.auth import (
+    UserPublic,
+    UserUpdate,
+    UsersFindRequest,
+    UsersBulkUpdateRequest,
+    UsersBulkUpdateResponse,
+    UsersBatchRequest,
+    UsersBatchResponse,
+    UserRole,
+)
 from src.app.services.user import UserService
 from src.app.utils.static.auth_crypto import role_active_access
+from src.app.utils.response_cache import cache_user_response
+from src.app.utils.responses import model_response
+from src.app.utils.unitofwork import (
+    IUnitOfWork,
+    get_read_uow,
+    get_read_your_writes_uow,
+    get_uow,
+)
 
 
 router = APIRouter(prefix="/user", tags=["Users"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
 
-@router.post("/list")
+
+@router.post("/list", response_model=list[UserPublic])
 @role_active_access({UserRole.SuperUserRole})
 async def get_users_list(
     request: Request,
     find_: UsersFindRequest,
-) -> list[User]:
-    return await UserService.get_users_list(request, find_)
+    uow: IUnitOfWork = Depends(get_read_uow),
+) -> ORJSONResponse:
+    """
+    The body stays a plain array. The keyset cursor for the next page and
+    the requested total are sent as X-Next-Cursor and X-Total-Count
+    """
+    users = await UserService.get_users_list(request, find_, uow)
+    headers = {}
+    if users.next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = users.next_cursor
+    if users.total is not None:
+        headers[TOTAL_COUNT_HEADER] = str(users.total)
+    return model_response(users.items, headers=headers)
 
 
 @router.get("/me")
-async def get_current_user(request: Request) -> User:
-    return await UserService.get_current_user(request)
+@cache_user_response(namespace="user:me")
+async def get_current_user(
+    request: Request,
+    response: Response,
+    uow: IUnitOfWork = Depends(get_read_your_writes_uow),
+) -> UserPublic:
+    return await UserService.get_current_user(request, uow)
 
 
 @router.put("/me")
@@ -30,8 +67,9 @@ async def get_current_user(request: Request) -> User:
 async def update_current_user(
     user: UserUpdate,
     request: Request,
-) -> User:
-    return await UserService.update_user(user, request)
+    uow: IUnitOfWork = Depends(get_uow),
+) -> UserPublic:
+    return await UserService.update_user(user, request, uow)
 
 
 @router.delete("/me")
@@ -39,18 +77,42 @@ async def update_current_user(
 async def delete_current_user(
     request: Request,
     response: Response,
+    uow: IUnitOfWork = Depends(get_uow),
 ):
-    await UserService.delete_current_user(response, request)
+    await UserService.delete_current_user(response, request, uow)
     return {"message": "User status is not active already"}
 
 
+@router.post("/batch")
+@role_active_access({UserRole.SuperUserRole})
+async def get_users_batch(
+    request: Request,
+    batch: UsersBatchRequest,
+    uow: IUnitOfWork = Depends(get_read_uow),
+) -> UsersBatchResponse:
+    return await UserService.get_users_by_ids(request, batch, uow)
+
+
+@router.patch("/bulk")
+@role_active_access({UserRole.SuperUserRole})
+async def bulk_update_users(
+    request: Request,
+    bulk: UsersBulkUpdateRequest,
+    uow: IUnitOfWork = Depends(get_uow),
+) -> UsersBulkUpdateResponse:
+    return await UserService.bulk_update_users(request, bulk, uow)
+
+
 @router.get("/{user_id}")
 @role_active_access({UserRole.SuperUserRole})
+@cache_user_response(namespace="user:by_id")
 async def get_user(
     request: Request,
+    response: Response,
     user_id: str,
-) -> User:
-    return await UserService.get_user_by_id(request, user_id)
+    uow: IUnitOfWork = Depends(get_read_uow),
+) -> UserPublic:
+    return await UserService.get_user_by_id(request, user_id, uow)
 
 
 @router.put("/{user_id}")
@@ -59,8 +121,11 @@ async def update_user(
     request: Request,
     user_id: str,
     user_data: UserUpdate,
-) -> User:
-    return await UserService.update_user_by_id(user_id, user_data, request)
+    uow: IUnitOfWork = Depends(get_uow),
+) -> UserPublic:
+    return await UserService.update_user_by_id(
+        user_id, user_data, request, uow
+    )
 
 
 @router.delete("/{user_id}")
@@ -68,5 +133,8 @@ async def update_user(
 async def delete_user_by_id(
     request: Request,
     user_id_to_delete: uuid.UUID,
-) -> User:
-    return await UserService.delete_user_by_id(request, user_id_to_delete)
\ No newline at end of file
+    uow: IUnitOfWork = Depends(get_uow),
+) -> UserPublic:
+    return await UserService.delete_user_by_id(
+        request, user_id_to_delete, uow
+    )
\ No newline at end of file
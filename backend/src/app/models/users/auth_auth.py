@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 
 from src.app.schemas.auth import User
 from src.app.schemas.types import UserRole
@@ -11,6 +11,9 @@ from src.database.types import UUID_PK, str_20, str_64
 
 class UserORM(Base, IsActiveMixin, CreationDateMixin):
     __tablename__ = "auth_user"
+    __table_args__ = (
+        Index("ix_auth_user_creation_date_id", "creation_date", "id"),
+    )
 
     id: Mapped[UUID_PK]
     login: Mapped[str] = mapped_column(
@@ -1,11 +1,12 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, TIMESTAMP
+from sqlalchemy import ForeignKey, TIMESTAMP, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
+from src.app_config.app_settings import app_settings
 from src.database.database_metadata import Base
 from src.database.types import INT_PK, UUID_C
 
@@ -17,10 +18,26 @@ class AuthTokenORM(Base):
 
     id: Mapped[INT_PK]
     refresh_token: Mapped[UUID_C]
+    # set at login and kept by every rotation, reuse of any token the
+    # session ever had revokes the session through it
+    family_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        index=True,
+        server_default=text("gen_random_uuid()"),
+    )
     expires_in: Mapped[int]
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now()
     )
+    # set by the app, the default covers writers that predate the column
+    expires_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        index=True,
+        server_default=text(
+            f"now() + interval "
+            f"'{app_settings.REFRESH_TOKEN_EXPIRE_DAYS} days'"
+        ),
+    )
     user_id: Mapped[uuid.UUID] = mapped_column(
         UUID, ForeignKey("auth_user.id", ondelete="CASCADE")
     )
@@ -29,7 +46,27 @@ class AuthTokenORM(Base):
         return AuthTokenORMSchema(
             id=self.id,
             refresh_token=self.refresh_token,
+            family_id=self.family_id,
             user_id=self.user_id,
             created_at=self.created_at,
             expires_in=self.expires_in,
-        )
\ No newline at end of file
+            expires_at=self.expires_at,
+        )
+
+class RotatedRefreshTokenORM(Base):
+    """
+    Tokens rotated out of a session. Kept until the session they were
+    rotated into would expire, so presenting one again is seen as reuse
+    """
+
+    __tablename__ = "auth_refresh_rotated"
+
+    refresh_token: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True
+    )
+    family_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), index=True
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), index=True
+    )
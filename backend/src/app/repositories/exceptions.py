@@ -1,3 +1,4 @@
+import math
 from typing import Any, Dict
 from typing_extensions import Annotated, Doc
 from fastapi import HTTPException, status
@@ -83,6 +84,49 @@ class UserPrivilegesException(HTTPException):
         )
 
 
+class PasswordPoolBusyException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service is busy, try again later",
+            headers={"Retry-After": "1"},
+        )
+
+
+class TooManyLoginAttemptsException(HTTPException):
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class RefreshInProgressException(HTTPException):
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Token refresh is already in progress, try again later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class UnsupportedSessionFilterException(HTTPException):
+    def __init__(self, field: str):
+        super().__init__(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Session store can't look sessions up by {field}",
+        )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid pagination cursor",
+        )
+
+
 class EnumExistenceException(HTTPException):
     def __init__(self, invalid_enum: str, enum_schema_name: str):
         detail = f"Enum {invalid_enum} doesn`t exist in {enum_schema_name}"
@@ -1,45 +1,173 @@
-from ...utils.repository import SQLAlchemyRepository
+from ...utils.repository import SQLAlchemyRepository, uuid_array
+from ...utils.single_flight import coalesced
 
 import uuid
+from abc import ABC, abstractmethod
+from datetime import timedelta
 
 from typing import Optional
-from src.app.models.users.auth_token import AuthTokenORM
-from sqlalchemy import delete, insert, select, update
-from src.app.schemas.auth import RefreshSessionCreate, AuthTokenORMSchema
+from src.app.models.users.auth_auth import UserORM
+from src.app.models.users.auth_token import (
+    AuthTokenORM,
+    RotatedRefreshTokenORM,
+)
+from sqlalchemy import any_, delete, func, insert, or_, select, update
+from src.app.schemas.auth import (
+    RefreshRotation,
+    RefreshSessionCreate,
+    AuthTokenORMSchema,
+)
 
 
-class AuthTokenRepository(SQLAlchemyRepository):
+class ITokenRepository(ABC):
+    """Refresh session store behind uow.token"""
+
+    @abstractmethod
+    async def add_token(self, token_refresh: RefreshSessionCreate) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def find_one_or_none_token(
+        self, *filter, **filter_by
+    ) -> AuthTokenORMSchema | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def logout_delete_token(self, token_id: int):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rotate_token(
+        self,
+        old_refresh_token: str,
+        new_refresh_token: uuid.UUID,
+        expires_in_seconds: float,
+    ) -> Optional[RefreshRotation]:
+        """
+        Swaps a live token for a new one in a single step, None when the
+        old token is unknown, expired or already rotated
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def revoke_token_family(
+        self, refresh_token: str
+    ) -> list[AuthTokenORMSchema]:
+        """
+        Deletes the session the token belongs to or was ever rotated out
+        of, found through its family_id
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_all_tokens_by_user_id(
+        self,
+        user_id: uuid.UUID,
+    ) -> list[AuthTokenORMSchema]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_all_tokens_by_user_ids(
+        self, user_ids: list[uuid.UUID]
+    ) -> int:
+        """Number of sessions deleted"""
+        raise NotImplementedError
+
+
+class AuthTokenRepository(SQLAlchemyRepository, ITokenRepository):
     model = AuthTokenORM
 
-    async def add_token(
-        self, token_refresh: RefreshSessionCreate
-    ) -> Optional[AuthTokenORMSchema]:
-        stmt = insert(self.model).values(dict(token_refresh)).returning(self.model)
-        result = await self.session.execute(stmt)
-        return result.scalars().first()
+    async def add_token(self, token_refresh: RefreshSessionCreate) -> None:
+        """
+        Plain Core INSERT without RETURNING, the statement text is constant
+        so asyncpg reuses its prepared statement
+        """
+        stmt = insert(self.model.__table__).values(
+            **dict(token_refresh),
+            expires_at=func.now()
+            + timedelta(seconds=token_refresh.expires_in),
+        )
+        await self.session.execute(stmt)
 
+    @coalesced("auth_refresh_session")
     async def find_one_or_none_token(
         self, *filter, **filter_by
     ) -> AuthTokenORMSchema | None:
         stmt = select(self.model).filter(*filter).filter_by(**filter_by)
-        result = await self.session.execute(stmt)
-        return result.scalars().one_or_none()
+        result = (await self.session.execute(stmt)).scalars().one_or_none()
+        return result.get_schema() if result else None
 
     async def logout_delete_token(self, token_id: int):
         stmt = delete(self.model).where(self.model.id == token_id)
         result = await self.session.execute(stmt)
 
-    async def update_token(
-        self, token_id: int, refresh_token: str, expires_in_seconds: float
-    ) -> AuthTokenORMSchema:
+    async def rotate_token(
+        self,
+        old_refresh_token: str,
+        new_refresh_token: uuid.UUID,
+        expires_in_seconds: float,
+    ) -> Optional[RefreshRotation]:
+        """
+        UPDATE ... FROM auth_user WHERE refresh_token = :old
+        AND expires_at > now() RETURNING the user's role and active flag.
+        The row lock makes a concurrent rotation of the same token see
+        zero rows. The old token then goes into auth_refresh_rotated
+        under the session's family_id, in the same transaction
+        """
+        expires_at = func.now() + timedelta(seconds=expires_in_seconds)
         stmt = (
             update(self.model)
-            .where(self.model.id == token_id)
-            .values(refresh_token=refresh_token, expires_in=expires_in_seconds)
-            .returning(self.model)
+            .where(
+                self.model.refresh_token == old_refresh_token,
+                self.model.expires_at > func.now(),
+                self.model.user_id == UserORM.id,
+            )
+            .values(
+                refresh_token=new_refresh_token,
+                expires_in=expires_in_seconds,
+                expires_at=expires_at,
+            )
+            .returning(
+                self.model.id,
+                self.model.user_id,
+                self.model.family_id,
+                UserORM.role,
+                UserORM.is_active,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        row = (await self.session.execute(stmt)).mappings().one_or_none()
+        if row is None:
+            return None
+        await self.session.execute(
+            insert(RotatedRefreshTokenORM.__table__).values(
+                refresh_token=old_refresh_token,
+                family_id=row["family_id"],
+                expires_at=expires_at,
+            )
         )
-        await self.session.commit()
-        return (await self.session.execute(stmt)).scalars().one()
+        return RefreshRotation.model_validate(row)
+
+    async def revoke_token_family(
+        self, refresh_token: str
+    ) -> list[AuthTokenORMSchema]:
+        family_id = (
+            select(RotatedRefreshTokenORM.family_id)
+            .where(RotatedRefreshTokenORM.refresh_token == refresh_token)
+            .scalar_subquery()
+        )
+        stmt = (
+            delete(self.model)
+            .where(
+                or_(
+                    self.model.refresh_token == refresh_token,
+                    self.model.family_id == family_id,
+                )
+            )
+            .returning(*self.columns)
+        )
+        result = await self.session.execute(stmt)
+        return self.construct_all(AuthTokenORMSchema, result.mappings())
 
     async def delete_all_tokens_by_user_id(
         self,
@@ -48,7 +176,41 @@ class AuthTokenRepository(SQLAlchemyRepository):
         stmt = (
             delete(self.model)
             .where(self.model.user_id == user_id)
-            .returning(self.model)
+            .returning(*self.columns)
         )
-        result = (await self.session.execute(stmt)).scalars().all()
-        return [i.get_schema() for i in result]
\ No newline at end of file
+        result = await self.session.execute(stmt)
+        return self.construct_all(AuthTokenORMSchema, result.mappings())
+
+    async def delete_all_tokens_by_user_ids(
+        self, user_ids: list[uuid.UUID]
+    ) -> int:
+        if not user_ids:
+            return 0
+        stmt = (
+            delete(self.model)
+            .where(self.model.user_id == any_(uuid_array(user_ids)))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    async def delete_expired_batch(self, limit: int) -> int:
+        """
+        DELETE ... WHERE id IN (SELECT ... LIMIT n) on the sessions and on
+        the rotated tokens, rows locked by another worker's reaper are
+        skipped. Rows deleted from both tables
+        """
+        deleted = 0
+        for model, key in (
+            (self.model, self.model.id),
+            (RotatedRefreshTokenORM, RotatedRefreshTokenORM.refresh_token),
+        ):
+            expired = (
+                select(key)
+                .where(model.expires_at <= func.now())
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            stmt = delete(model).where(key.in_(expired))
+            deleted += (await self.session.execute(stmt)).rowcount
+        return deleted
\ No newline at end of file
@@ -0,0 +1,352 @@
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from src.app_config.config_redis import RedisRepository
+from src.app.repositories.exceptions import (
+    UnsupportedSessionFilterException,
+)
+from src.app.schemas.auth import (
+    AuthTokenORMSchema,
+    RefreshRotation,
+    RefreshSessionCreate,
+)
+
+from .auth_token import ITokenRepository
+from .auth_user import AuthRepository
+
+
+SESSION_KEY = "refresh_session:"
+SESSION_ID_KEY = "refresh_session:id:"
+USER_SESSIONS_KEY = "refresh_sessions:user:"
+ROTATED_KEY = "refresh_session:rotated:"
+FAMILY_KEY = "refresh_session:family:"
+SEQUENCE_KEY = "refresh_session:seq"
+
+# Scripts build their keys from the arguments, so they expect a single
+# (non-cluster) Redis
+_ADD_SESSION = """
+local id = redis.call('INCR', KEYS[1])
+local key = 'refresh_session:' .. ARGV[1]
+local ttl = tonumber(ARGV[3])
+redis.call('HSET', key, 'id', id, 'user_id', ARGV[2],
+           'expires_in', ARGV[3], 'created_at', ARGV[4],
+           'family_id', ARGV[5])
+redis.call('EXPIRE', key, ttl)
+redis.call('SET', 'refresh_session:id:' .. id, ARGV[1], 'EX', ttl)
+redis.call('SET', 'refresh_session:family:' .. ARGV[5], ARGV[1], 'EX', ttl)
+local user_key = 'refresh_sessions:user:' .. ARGV[2]
+redis.call('SADD', user_key, ARGV[1])
+if redis.call('TTL', user_key) < ttl then
+    redis.call('EXPIRE', user_key, ttl)
+end
+return id
+"""
+
+_ROTATE_SESSION = """
+local old_key = 'refresh_session:' .. ARGV[1]
+local id = redis.call('HGET', old_key, 'id')
+if not id then
+    return nil
+end
+local user_id = redis.call('HGET', old_key, 'user_id')
+-- sessions stored before families existed start one here
+local family = redis.call('HGET', old_key, 'family_id') or ARGV[5]
+local key = 'refresh_session:' .. ARGV[2]
+local ttl = tonumber(ARGV[3])
+redis.call('DEL', old_key)
+redis.call('HSET', key, 'id', id, 'user_id', user_id,
+           'expires_in', ARGV[3], 'created_at', ARGV[4],
+           'family_id', family)
+redis.call('EXPIRE', key, ttl)
+redis.call('SET', 'refresh_session:id:' .. id, ARGV[2], 'EX', ttl)
+redis.call('SET', 'refresh_session:family:' .. family, ARGV[2], 'EX', ttl)
+redis.call('SET', 'refresh_session:rotated:' .. ARGV[1], family, 'EX', ttl)
+local user_key = 'refresh_sessions:user:' .. user_id
+redis.call('SREM', user_key, ARGV[1])
+redis.call('SADD', user_key, ARGV[2])
+if redis.call('TTL', user_key) < ttl then
+    redis.call('EXPIRE', user_key, ttl)
+end
+return {id, user_id}
+"""
+
+_REVOKE_FAMILY = """
+local rotated_key = 'refresh_session:rotated:' .. ARGV[1]
+local family = redis.call('GET', rotated_key)
+if not family then
+    return nil
+end
+redis.call('DEL', rotated_key)
+local family_key = 'refresh_session:family:' .. family
+local token = redis.call('GET', family_key)
+if not token then
+    return nil
+end
+local key = 'refresh_session:' .. token
+local id = redis.call('HGET', key, 'id')
+if not id then
+    return nil
+end
+local user_id = redis.call('HGET', key, 'user_id')
+local session = {token, id, user_id,
+    redis.call('HGET', key, 'expires_in'),
+    redis.call('HGET', key, 'created_at'), redis.call('TTL', key), family}
+redis.call('SREM', 'refresh_sessions:user:' .. user_id, token)
+redis.call('DEL', key, 'refresh_session:id:' .. id, family_key)
+return session
+"""
+
+_DELETE_SESSION = """
+local id_key = 'refresh_session:id:' .. ARGV[1]
+local token = redis.call('GET', id_key)
+if not token then
+    return 0
+end
+local key = 'refresh_session:' .. token
+local user_id = redis.call('HGET', key, 'user_id')
+if user_id then
+    redis.call('SREM', 'refresh_sessions:user:' .. user_id, token)
+end
+local family = redis.call('HGET', key, 'family_id')
+if family then
+    redis.call('DEL', 'refresh_session:family:' .. family)
+end
+return redis.call('DEL', key, id_key)
+"""
+
+_DELETE_USER_SESSIONS = """
+local user_key = 'refresh_sessions:user:' .. ARGV[1]
+local deleted = {}
+for _, token in ipairs(redis.call('SMEMBERS', user_key)) do
+    local key = 'refresh_session:' .. token
+    local id = redis.call('HGET', key, 'id')
+    if id then
+        local ttl = redis.call('TTL', key)
+        local family = redis.call('HGET', key, 'family_id') or ''
+        table.insert(deleted, {token, id,
+            redis.call('HGET', key, 'expires_in'),
+            redis.call('HGET', key, 'created_at'), ttl, family})
+        redis.call('DEL', key, 'refresh_session:id:' .. id,
+                   'refresh_session:family:' .. family)
+    end
+end
+redis.call('DEL', user_key)
+return deleted
+"""
+
+_DELETE_USERS_SESSIONS = """
+local deleted = 0
+for _, user_id in ipairs(ARGV) do
+    local user_key = 'refresh_sessions:user:' .. user_id
+    for _, token in ipairs(redis.call('SMEMBERS', user_key)) do
+        local key = 'refresh_session:' .. token
+        local id = redis.call('HGET', key, 'id')
+        if id then
+            local family = redis.call('HGET', key, 'family_id') or ''
+            redis.call('DEL', key, 'refresh_session:id:' .. id,
+                       'refresh_session:family:' .. family)
+            deleted = deleted + 1
+        end
+    end
+    redis.call('DEL', user_key)
+end
+return deleted
+"""
+
+
+class RedisAuthTokenRepository(ITokenRepository):
+    """
+    Refresh sessions as Redis hashes expiring on their own TTL, plus a set
+    of tokens per user. Writes are applied immediately, uow.commit() and
+    rollback() don't cover them.
+    Role and active flag for rotations come from the user repository
+    """
+
+    _scripts: Dict[str, object] = {}
+
+    def __init__(self, repo: RedisRepository, users: AuthRepository):
+        self.repo = repo
+        self.users = users
+
+    def _script(self, source: str):
+        # bound to whichever client registered it, always called with the
+        # current one since RedisManager may swap it
+        script = self._scripts.get(source)
+        if script is None:
+            script = self.repo.redis.register_script(source)
+            self._scripts[source] = script
+        return script
+
+    async def _run(self, source: str, keys: List[str], args: list):
+        return await self._script(source)(
+            keys=keys, args=args, client=self.repo.redis
+        )
+
+    @staticmethod
+    def _schema(
+        refresh_token: str,
+        data: Dict[bytes, bytes],
+        ttl: Optional[int] = None,
+    ) -> AuthTokenORMSchema:
+        created_at = float(data[b"created_at"])
+        expires_in = int(data[b"expires_in"])
+        expires_at = (
+            time.time() + ttl if ttl is not None else created_at + expires_in
+        )
+        return AuthTokenORMSchema(
+            id=int(data[b"id"]),
+            user_id=data[b"user_id"].decode(),
+            family_id=data.get(b"family_id", b"").decode() or None,
+            refresh_token=refresh_token,
+            expires_in=expires_in,
+            created_at=datetime.fromtimestamp(created_at, timezone.utc),
+            expires_at=datetime.fromtimestamp(expires_at, timezone.utc),
+        )
+
+    async def add_token(self, token_refresh: RefreshSessionCreate) -> None:
+        await self._run(
+            _ADD_SESSION,
+            [SEQUENCE_KEY],
+            [
+                str(token_refresh.refresh_token),
+                str(token_refresh.user_id),
+                int(token_refresh.expires_in),
+                time.time(),
+                str(token_refresh.family_id),
+            ],
+        )
+
+    async def _find_by_token(
+        self, refresh_token: str
+    ) -> Optional[AuthTokenORMSchema]:
+        data = await self.repo.redis.hgetall(SESSION_KEY + refresh_token)
+        if not data:
+            return None
+        return self._schema(refresh_token, data)
+
+    async def find_one_or_none_token(
+        self, *filter, **filter_by
+    ) -> AuthTokenORMSchema | None:
+        """
+        Lookup by one of refresh_token, id, family_id or user_id, the last
+        returns any live session of the user. Anything else, SQL
+        expressions included, raises UnsupportedSessionFilterException
+        """
+        if filter:
+            raise UnsupportedSessionFilterException("an SQL expression")
+        if len(filter_by) != 1:
+            raise UnsupportedSessionFilterException(
+                ", ".join(filter_by) or "nothing"
+            )
+        (field, value), = filter_by.items()
+        if value is None:
+            return None
+        if field == "refresh_token":
+            return await self._find_by_token(str(value))
+        if field in ("id", "family_id"):
+            prefix = SESSION_ID_KEY if field == "id" else FAMILY_KEY
+            token = await self.repo.redis.get(f"{prefix}{value}")
+            return token and await self._find_by_token(token.decode())
+        if field == "user_id":
+            tokens = await self.repo.redis.smembers(
+                f"{USER_SESSIONS_KEY}{value}"
+            )
+            for token in tokens:
+                session = await self._find_by_token(token.decode())
+                if session is not None:
+                    return session
+            return None
+        raise UnsupportedSessionFilterException(field)
+
+    async def logout_delete_token(self, token_id: int):
+        await self._run(_DELETE_SESSION, [], [token_id])
+
+    async def rotate_token(
+        self,
+        old_refresh_token: str,
+        new_refresh_token: uuid.UUID,
+        expires_in_seconds: float,
+    ) -> Optional[RefreshRotation]:
+        rotated = await self._run(
+            _ROTATE_SESSION,
+            [],
+            [
+                str(old_refresh_token),
+                str(new_refresh_token),
+                int(expires_in_seconds),
+                time.time(),
+                str(uuid.uuid4()),
+            ],
+        )
+        if rotated is None:
+            return None
+        token_id, user_id = rotated
+        user = await self.users.find_one_or_none_user(id=user_id.decode())
+        if user is None:
+            return None
+        return RefreshRotation(
+            id=int(token_id),
+            user_id=user.id,
+            role=user.role,
+            is_active=user.is_active,
+        )
+
+    async def revoke_token_family(
+        self, refresh_token: str
+    ) -> list[AuthTokenORMSchema]:
+        """
+        Expired sessions are already gone, only reuse of a token rotated
+        out of a live session finds anything
+        """
+        revoked = await self._run(_REVOKE_FAMILY, [], [str(refresh_token)])
+        if revoked is None:
+            return []
+        token, token_id, user_id, expires_in, created_at, ttl, family = (
+            revoked
+        )
+        return [
+            self._schema(
+                token.decode(),
+                {
+                    b"id": token_id,
+                    b"user_id": user_id,
+                    b"expires_in": expires_in,
+                    b"created_at": created_at,
+                    b"family_id": family,
+                },
+                ttl=ttl,
+            )
+        ]
+
+    async def delete_all_tokens_by_user_id(
+        self,
+        user_id: uuid.UUID,
+    ) -> list[AuthTokenORMSchema]:
+        deleted = await self._run(_DELETE_USER_SESSIONS, [], [str(user_id)])
+        return [
+            self._schema(
+                token.decode(),
+                {
+                    b"id": token_id,
+                    b"user_id": str(user_id).encode(),
+                    b"expires_in": expires_in,
+                    b"created_at": created_at,
+                    b"family_id": family,
+                },
+                ttl=ttl,
+            )
+            for token, token_id, expires_in, created_at, ttl, family in (
+                deleted
+            )
+        ]
+
+    async def delete_all_tokens_by_user_ids(
+        self, user_ids: list[uuid.UUID]
+    ) -> int:
+        if not user_ids:
+            return 0
+        return await self._run(
+            _DELETE_USERS_SESSIONS, [], [str(i) for i in user_ids]
+        )
@@ -1,41 +1,139 @@
 # from src.app.models.user import User
-from ...utils.repository import SQLAlchemyRepository
+from ...utils.repository import SQLAlchemyRepository, uuid_array
+from ...utils.single_flight import REPLICA_KEY, coalesced
+from ...utils.user_cache import user_cache
 from src.app.models.users.auth_auth import UserORM
-from sqlalchemy import insert, select, update
+from src.app.repositories.exceptions import InvalidCursorException
+from sqlalchemy import any_, insert, select, tuple_, update
 from src.app.schemas.auth import (
+    PaginateSchema,
     UserCreateDB,
     User,
+    UserPublic,
     UserUpdate,
     UsersFindRequest,
+    UsersListResponse,
 )
+from datetime import date
+import base64
+import binascii
+import json
 import uuid
 
 
+def encode_cursor(creation_date: date, user_id: uuid.UUID) -> str:
+    raw = json.dumps([creation_date.isoformat(), str(user_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[date, uuid.UUID]:
+    try:
+        creation_date, user_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return date.fromisoformat(creation_date), uuid.UUID(user_id)
+    except (binascii.Error, TypeError, ValueError):
+        raise InvalidCursorException
+
+
 class AuthRepository(SQLAlchemyRepository):
     model = UserORM
+    export_exclude = ("hashed_password",)
 
+    @coalesced("auth_user")
     async def find_one_or_none_user(self, *filter, **filter_by) -> User | None:
+        """
+        By id: cache first, the row is read without hashed_password so
+        hits and misses return the same DTO. Other filters (login) read
+        the whole row for the password check
+        """
+        by_id = not filter and filter_by.keys() == {"id"}
+        if by_id:
+            cached = await user_cache.get(filter_by["id"])
+            if cached is not None:
+                return cached
+            stmt = select(*self.export_columns).filter_by(**filter_by)
+            row = (await self.session.execute(stmt)).mappings().one_or_none()
+            if row is None:
+                return None
+            (user,) = self.construct_all(User, [row])
+            if self._fills_cache:
+                await user_cache.set(user)
+            return user
+
         stmt = select(self.model).filter(*filter).filter_by(**filter_by)
         result = (await self.session.execute(stmt)).scalars().one_or_none()
         if result:
             return result.get_schema()
         return None
 
+    @property
+    def _fills_cache(self) -> bool:
+        """
+        Replica rows may predate an eviction, caching them would bring a
+        stale user back for the whole cache TTL
+        """
+        return not self.session.info.get(REPLICA_KEY, False)
+
+    async def find_users_by_ids(
+        self, user_ids: list[uuid.UUID]
+    ) -> dict[str, User]:
+        """
+        Found users by str(id): cache hits first, then a single
+        WHERE id = ANY(:ids) for the rest
+        """
+        found = await user_cache.get_many(user_ids)
+        missing = list(
+            dict.fromkeys(i for i in user_ids if str(i) not in found)
+        )
+        if missing:
+            stmt = select(*self.export_columns).where(
+                self.model.id == any_(uuid_array(missing))
+            )
+            result = await self.session.execute(stmt)
+            users = self.construct_all(User, result.mappings())
+            if self._fills_cache:
+                await user_cache.set_many(users)
+            found.update((str(i.id), i) for i in users)
+        return found
+
+    async def _invalidate_cached_user(self, user_id: uuid.UUID) -> None:
+        """
+        Evicts now and once more after commit (see UnitOfWork.commit), so a
+        concurrent reader can't re-cache the row as it was before the update
+        """
+        await user_cache.invalidate(user_id)
+        self.session.info.setdefault("invalidated_users", set()).add(user_id)
+
+    async def _invalidate_cached_users(
+        self, user_ids: list[uuid.UUID]
+    ) -> None:
+        await user_cache.invalidate_many(user_ids)
+        self.session.info.setdefault("invalidated_users", set()).update(
+            user_ids
+        )
+
     async def add_one_user(self, user: UserCreateDB) -> User:
         stmt = insert(self.model).values(dict(user)).returning(self.model)
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
     async def update_user(
-        self, cur_user_id: uuid.UUID, user_update: UserUpdate
+        self,
+        cur_user_id: uuid.UUID,
+        user_update: UserUpdate,
+        hashed_password: str | None = None,
     ) -> User:
+        values = user_update.model_dump(exclude={"password"}, exclude_none=True)
+        if hashed_password is not None:
+            values["hashed_password"] = hashed_password
         stmt = (
             update(self.model)
             .where(self.model.id == cur_user_id)
-            .values(dict(user_update))
+            .values(**values)
             .returning(self.model)
         )
-        return (await self.session.execute(stmt)).scalars().one()
+        result = (await self.session.execute(stmt)).scalars().one()
+        await self._invalidate_cached_user(cur_user_id)
+        return result
 
     async def activeness_switcher(
         self, cur_user_id: uuid.UUID, activeness: bool
@@ -46,20 +144,91 @@ class AuthRepository(SQLAlchemyRepository):
             .values(is_active=activeness)
             .returning(self.model)
         )
-        return (await self.session.execute(stmt)).scalars().one()
+        result = (await self.session.execute(stmt)).scalars().one()
+        await self._invalidate_cached_user(cur_user_id)
+        return result
 
-    async def find_all_users(self, find_request: UsersFindRequest | None) -> list[User]:
+    async def bulk_update_users(
+        self, user_ids: list[uuid.UUID], values: dict
+    ) -> list[User]:
+        """
+        UPDATE auth_user ... WHERE id = ANY(:ids) RETURNING, the id list is
+        bound as one array parameter whatever its length
+        """
+        if not user_ids:
+            return []
         stmt = (
-            select(self.model)
-            .offset(find_request.paginate.offset)
-            .limit(find_request.paginate.limit)
-            .filter_by(
-                **{
+            update(self.model)
+            .where(self.model.id == any_(uuid_array(user_ids)))
+            .values(**values)
+            .returning(*self.export_columns)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        users = self.construct_all(User, result.mappings())
+        await self._invalidate_cached_users([i.id for i in users])
+        return users
+
+    async def find_all_users(
+        self, find_request: UsersFindRequest | None
+    ) -> UsersListResponse:
+        """
+        Ordered by (creation_date, id). Cursor mode seeks past the last
+        row of the previous page through ix_auth_user_creation_date_id
+        instead of scanning and skipping `offset` rows.
+        Items are built from plain rows, not ORM objects
+        """
+        paginate = PaginateSchema()
+        filters = {}
+        if find_request is not None:
+            paginate = find_request.paginate or paginate
+            if find_request.filters is not None:
+                filters = {
                     k: v
-                    for k, v in (dict(find_request.filters).items())
+                    for k, v in dict(find_request.filters).items()
                     if v is not None
                 }
+
+        stmt = (
+            select(*self.export_columns)
+            .filter_by(**filters)
+            .order_by(self.model.creation_date, self.model.id)
+        )
+        if not paginate.is_cursor:
+            stmt = stmt.offset(paginate.offset).limit(paginate.limit)
+            result = await self.session.execute(stmt)
+            return UsersListResponse.model_construct(
+                items=self.construct_all(UserPublic, result.mappings()),
+                next_cursor=None,
+                total=await self._total(find_request, filters),
             )
+
+        if paginate.cursor is not None:
+            stmt = stmt.where(
+                tuple_(self.model.creation_date, self.model.id)
+                > tuple_(*decode_cursor(paginate.cursor))
+            )
+        stmt = stmt.limit(paginate.limit + 1)
+        result = (await self.session.execute(stmt)).mappings().all()
+
+        page = result[: paginate.limit]
+        next_cursor = None
+        if len(result) > paginate.limit and page:
+            next_cursor = encode_cursor(
+                page[-1]["creation_date"], page[-1]["id"]
+            )
+        return UsersListResponse.model_construct(
+            items=self.construct_all(UserPublic, page),
+            next_cursor=next_cursor,
+            total=await self._total(find_request, filters),
         )
-        result = (await self.session.execute(stmt)).scalars().all()
-        return [i.get_schema() for i in result]
\ No newline at end of file
+
+    async def _total(
+        self, find_request: UsersFindRequest | None, filters: dict
+    ) -> int | None:
+        match find_request and find_request.total:
+            case "exact":
+                return await self.count(**filters)
+            case "estimated":
+                return await self.estimate_count(**filters)
+        return None
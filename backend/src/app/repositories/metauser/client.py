@@ -0,0 +1,7 @@
+from ...utils.repository import SQLAlchemyRepository
+from src.app.models.users.client import ClientORM
+
+
+class ClientRepository(SQLAlchemyRepository):
+    model = ClientORM
+    export_exclude = ("password",)
@@ -1,7 +1,7 @@
 from src.app.schemas.types import UserBase, UserRole, Password, ID
-from pydantic import BaseModel, UUID4
+from pydantic import BaseModel, Field, UUID4, model_validator
 import uuid
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime, timedelta
 
 
@@ -22,19 +22,30 @@ class UserUpdate(UserBase):
     password: Optional[Password] = None
 
 
-class User(UserBase):
+class UserPublic(UserBase):
     id: UUID4
-    hashed_password: str
     is_active: bool
 
     class Config:
         from_attributes = True
 
 
+class User(UserPublic):
+    """
+    Internal DTO, never a response model. Only lookups by login load
+    hashed_password, by-id lookups leave it None whether they hit the
+    cache or the database
+    """
+
+    hashed_password: Optional[str] = None
+
+
 class RefreshSessionCreate(BaseModel):
     refresh_token: UUID4  # тут произошла замена
     expires_in: int
     user_id: UUID4  # тут тоже произошла замена
+    # a new family per login, rotations carry it over
+    family_id: UUID4 = Field(default_factory=uuid.uuid4)
 
     class Config:
         json_schema_extra = {
@@ -55,6 +66,9 @@ class Token(BaseModel):
 class AuthTokenORMSchema(RefreshSessionCreate):
     id: ID
     created_at: datetime
+    expires_at: Optional[datetime] = None
+    # None for Redis sessions stored before families existed
+    family_id: Optional[UUID4] = None
 
     class Config:
         json_schema_extra = {
@@ -68,9 +82,24 @@ class AuthTokenORMSchema(RefreshSessionCreate):
         }
 
 
+class RefreshRotation(BaseModel):
+    """Rotated session joined with the owner's current role and status"""
+
+    id: ID
+    user_id: UUID4
+    role: Optional[UserRole] = None
+    is_active: bool
+
+
 class PaginateSchema(BaseModel):
     offset: int = 0
     limit: int = 100
+    mode: Literal["offset", "cursor"] = "offset"
+    cursor: Optional[str] = None
+
+    @property
+    def is_cursor(self) -> bool:
+        return self.mode == "cursor" or self.cursor is not None
 
 
 class UsersListFilter(BaseModel):
@@ -82,6 +111,63 @@ class UsersListFilter(BaseModel):
 class UsersFindRequest(BaseModel):
     paginate: Optional[PaginateSchema] = None
     filters: Optional[UsersListFilter] = None
+    total: Optional[Literal["exact", "estimated"]] = None
+
+
+class UsersListResponse(BaseModel):
+    items: list[UserPublic]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class UsersBulkChanges(BaseModel):
+    role: Optional[UserRole] = None
+    is_active: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def _not_empty(self) -> "UsersBulkChanges":
+        if self.role is None and self.is_active is None:
+            raise ValueError("Nothing to update")
+        return self
+
+
+class UsersBulkUpdateRequest(BaseModel):
+    ids: list[UUID4] = Field(min_length=1, max_length=1000)
+    changes: UsersBulkChanges
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "ids": [str(uuid.uuid4()), str(uuid.uuid4())],
+                "changes": {"is_active": False},
+            }
+        }
+
+
+class UserBulkResult(BaseModel):
+    id: UUID4
+    status: Literal["updated", "not_found", "skipped"]
+    user: Optional[UserPublic] = None
+
+
+class UsersBulkUpdateResponse(BaseModel):
+    results: list[UserBulkResult]
+    updated: int
+    sessions_revoked: int
+
+
+class UsersBatchRequest(BaseModel):
+    ids: list[UUID4] = Field(min_length=1, max_length=500)
+
+
+class UserBatchItem(BaseModel):
+    id: UUID4
+    found: bool
+    user: Optional[UserPublic] = None
+
+
+class UsersBatchResponse(BaseModel):
+    items: list[UserBatchItem]
 
 
 class UserCreateDB(UserBase):
@@ -90,9 +176,10 @@ class UserCreateDB(UserBase):
 
 class DependentToken(BaseModel):
     token: str
-    user_id: ID
+    user_id: UUID4
     role: UserRole
     is_active: bool
+    exp: Optional[int] = None
 
 
 class TokenAccessRefreshCreate(BaseModel):
@@ -0,0 +1,101 @@
+import csv
+import io
+from enum import Enum
+from typing import AsyncIterator, Callable, Literal, Mapping, Sequence
+
+import orjson
+from fastapi import Request
+
+from src.app_config.app_settings import app_settings
+from src.app.repositories.exceptions import (
+    UserNotActiveException,
+    UserPrivilegesException,
+)
+from src.app.schemas.auth import UserRole
+from src.app.utils.static.auth_crypto import TokenUtils
+from src.app.utils.repository import SQLAlchemyRepository
+from src.app.utils.unitofwork import IUnitOfWork
+
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _ndjson_chunk(rows: Sequence[Mapping], header: bool) -> bytes:
+    return b"".join(orjson.dumps(dict(row)) + b"\n" for row in rows)
+
+
+def _csv_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _csv_chunk(rows: Sequence[Mapping], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(rows[0].keys())
+    writer.writerows([_csv_value(v) for v in row.values()] for row in rows)
+    return buffer.getvalue().encode()
+
+
+ENCODERS: dict[str, Callable[[Sequence[Mapping], bool], bytes]] = {
+    "ndjson": _ndjson_chunk,
+    "csv": _csv_chunk,
+}
+
+
+class ExportService:
+    @classmethod
+    async def check_caller(cls, request: Request, uow: IUnitOfWork) -> None:
+        """
+        The token may outlive a deactivation or a demotion, so the caller is
+        re-read before the response starts streaming and can't fail anymore
+        """
+        async with uow:
+            token_dependency = await TokenUtils.token_user_dependency(request)
+            current_user = await uow.auth.find_one_or_none_user(
+                id=token_dependency.user_id
+            )
+            if current_user is None or current_user.is_active == False:
+                raise UserNotActiveException
+            if current_user.role != UserRole.SuperUserRole:
+                raise UserPrivilegesException
+
+    @classmethod
+    async def stream_table(
+        cls,
+        uow: IUnitOfWork,
+        repository: Callable[[IUnitOfWork], SQLAlchemyRepository],
+        export_format: ExportFormat,
+    ) -> AsyncIterator[bytes]:
+        """
+        One chunk per fetched partition. The unit of work stays open until
+        the response has been sent, so it's entered here rather than in
+        the route
+        """
+        encode = ENCODERS[export_format]
+        header = True
+        async with uow:
+            rows = repository(uow).stream_rows(app_settings.EXPORT_FETCH_SIZE)
+            async for partition in rows:
+                if partition:
+                    yield encode(partition, header)
+                    header = False
+
+    @classmethod
+    def export_users(
+        cls, uow: IUnitOfWork, export_format: ExportFormat
+    ) -> AsyncIterator[bytes]:
+        return cls.stream_table(uow, lambda u: u.auth, export_format)
+
+    @classmethod
+    def export_clients(
+        cls, uow: IUnitOfWork, export_format: ExportFormat
+    ) -> AsyncIterator[bytes]:
+        return cls.stream_table(uow, lambda u: u.client, export_format)
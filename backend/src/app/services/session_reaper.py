@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from src.app_config.app_settings import app_settings
+from src.app.utils.metrics import metrics
+from src.app.utils.unitofwork import UnitOfWork
+
+
+logger = logging.getLogger(__name__)
+
+
+class SessionReaper:
+    """
+    Background deletion of expired refresh sessions in bounded batches,
+    pausing between batches so the primary isn't hammered
+    """
+
+    def __init__(self, interval: float, batch_size: int, batch_pause: float):
+        self._interval = interval
+        self._batch_size = batch_size
+        self._batch_pause = batch_pause
+        self._task: Optional[asyncio.Task] = None
+
+        self.rows_reaped = 0
+        self.batches = 0
+        self.last_run_at: Optional[float] = None
+        self.last_run_reaped = 0
+        self.table_size: Optional[int] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reap()
+            except Exception:
+                logger.exception("Refresh session reaper failed")
+            await asyncio.sleep(self._interval)
+
+    async def reap(self) -> int:
+        reaped_total = 0
+        while True:
+            async with UnitOfWork() as uow:
+                reaped = await uow.token.delete_expired_batch(self._batch_size)
+                await uow.commit()
+            self.batches += 1
+            reaped_total += reaped
+            if reaped < self._batch_size:
+                break
+            await asyncio.sleep(self._batch_pause)
+
+        self.rows_reaped += reaped_total
+        self.last_run_reaped = reaped_total
+        self.last_run_at = time.time()
+        async with UnitOfWork(read_only=True) as uow:
+            self.table_size = await uow.token.estimate_count()
+        return reaped_total
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows_reaped": self.rows_reaped,
+            "batches": self.batches,
+            "last_run_at": self.last_run_at,
+            "last_run_reaped": self.last_run_reaped,
+            "table_size_estimate": self.table_size,
+        }
+
+
+session_reaper = SessionReaper(
+    interval=app_settings.SESSION_REAPER_INTERVAL_SECONDS,
+    batch_size=app_settings.SESSION_REAPER_BATCH_SIZE,
+    batch_pause=app_settings.SESSION_REAPER_BATCH_PAUSE_SECONDS,
+)
+metrics.register("session_reaper", session_reaper.stats)
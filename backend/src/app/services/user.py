@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional
 
 from fastapi import HTTPException, status, Request, Response
@@ -6,7 +7,7 @@ import uuid
 
 from sqlalchemy.exc import IntegrityError
 
-from src.app.utils.unitofwork import IUnitOfWork, UnitOfWork
+from src.app.utils.unitofwork import IUnitOfWork
 from src.app.schemas.auth import (
     UserCreate,
     UserCreateDB,
@@ -17,12 +18,23 @@ from src.app.schemas.auth import (
     UserUpdate,
     UserRole,
     UsersFindRequest,
+    UsersListResponse,
+    UsersBulkUpdateRequest,
+    UsersBulkUpdateResponse,
+    UserBulkResult,
+    UsersBatchRequest,
+    UsersBatchResponse,
+    UserBatchItem,
 )
 from src.app.utils.static.auth_crypto import (
     TokenUtils,
     PasswordStatic,
     CookieUtils,
 )
+from src.app.utils.static.token_cache import token_claims_cache
+from src.app.utils.refresh_grace import refresh_grace
+from src.app.utils.login_limiter import login_limiter
+from src.app.utils.response_cache import invalidate_user_responses
 from src.app.repositories.exceptions import (
     InvalidCredentialsException,
     UserNotActiveException,
@@ -31,6 +43,7 @@ from src.app.repositories.exceptions import (
     UserPrivilegesException,
     UserNotFoundException,
     UnavailableLoginException,
+    RefreshInProgressException,
 )
 from src.app.schemas.auth import TokenAccessRefreshCreate
 
@@ -38,26 +51,32 @@ from src.app.schemas.auth import TokenAccessRefreshCreate
 class UserService:
     @classmethod
     async def register_new_user(
-        cls, user: UserCreate, uow: IUnitOfWork = UnitOfWork()
+        cls, user: UserCreate, uow: IUnitOfWork
     ) -> User:
+        """
+        The password is hashed before the session opens, so no pooled
+        connection waits on bcrypt. A taken login costs that hash, the
+        unique index still rejects a login registered meanwhile
+        """
+        if user.role == "SuperUserRole":
+            raise HTTPException(
+                status_code=400,
+                detail="SuperUser not approved"
+            )
+        hashed_password = await PasswordStatic.get_password_hash(
+            user.password
+        )
+
         async with uow:
             user_exist = await uow.auth.find_one_or_none_user(login=user.login)
             if user_exist:
                 raise UnavailableLoginException
-            
-            if user.role == "SuperUserRole":
-                raise HTTPException(
-                    status_code=400,
-                    detail="SuperUser not approved"
-                )
-            
+
             try:
                 db_user = await uow.auth.add_one_user(
                     user=UserCreateDB(
                         **user.model_dump(),
-                        hashed_password=PasswordStatic.get_password_hash(
-                            user.password
-                        )
+                        hashed_password=hashed_password,
                     )
                 )
             except IntegrityError:
@@ -68,11 +87,12 @@ class UserService:
 
     @classmethod
     async def authenticate_user(
-        cls, login: str, password: str, uow: IUnitOfWork = UnitOfWork()
+        cls, login: str, password: str, uow: IUnitOfWork
     ) -> Optional[User]:
         async with uow:
             db_user = await uow.auth.find_one_or_none_user(login=login)
-            if db_user and PasswordStatic.is_valid_password(
+            await uow.rollback()
+            if db_user and await PasswordStatic.is_valid_password(
                 password, db_user.hashed_password
             ):
                 return db_user
@@ -84,17 +104,31 @@ class UserService:
         response: Response,
         login: str,
         password: str,
-        uow: IUnitOfWork = UnitOfWork(),
+        uow: IUnitOfWork,
+        client_ip: Optional[str] = None,
     ) -> Optional[Token]:
+        """
+        Rate limited per login and client IP before any DB or bcrypt work,
+        a successful attempt is taken back out so only failures count.
+        The lookup's transaction ends before bcrypt runs, so no pooled
+        connection is held during the check. With the SQL session store
+        a successful login checks one out a second time for the INSERT
+        and COMMIT: two short checkouts of three round-trips each
+        (BEGIN, statement, ROLLBACK or COMMIT) instead of one held
+        through bcrypt. The Redis store needs no second checkout
+        """
+        attempt = await login_limiter.check(login, client_ip)
         async with uow:
             db_user = await uow.auth.find_one_or_none_user(login=login)
+            await uow.rollback()
             if not (
                 db_user
-                and PasswordStatic.is_valid_password(
+                and await PasswordStatic.is_valid_password(
                     password, db_user.hashed_password
                 )
             ):
                 raise InvalidCredentialsException
+            await login_limiter.forgive(login, client_ip, attempt)
 
             token_create: TokenAccessRefreshCreate = (
                 await TokenUtils.access_refresh_tokens_creator(
@@ -127,7 +161,7 @@ class UserService:
         cls,
         response: Response,
         request: Request,
-        uow: IUnitOfWork = UnitOfWork(),
+        uow: IUnitOfWork,
     ) -> bool:
         """
         1)get current token
@@ -155,7 +189,7 @@ class UserService:
         cls,
         response: Response,
         request: Request,
-        uow: IUnitOfWork = UnitOfWork(),
+        uow: IUnitOfWork,
     ) -> bool:
         """
         1)get current token
@@ -170,18 +204,25 @@ class UserService:
             current_user = await uow.auth.find_one_or_none_user(
                 id=token_dependency.user_id
             )
+            if current_user is None:
+                raise UserNotFoundException
             if current_user.is_active == False:
                 raise UserNotActiveException
 
+            # the cookie may be missing or its session already gone
             refresh_session = await uow.token.find_one_or_none_token(
                 refresh_token=request.cookies.get("refresh_token")
             )
-            await uow.token.logout_delete_token(refresh_session.id)
+            if refresh_session is not None:
+                await uow.token.logout_delete_token(refresh_session.id)
             deleted_user = await uow.auth.activeness_switcher(
                 current_user.id, False
             )
+            await invalidate_user_responses(current_user.id)
             CookieUtils.access_refresh_cookies_deleter(response)
             await uow.commit()
+            token_claims_cache.invalidate_user(current_user.id)
+            await invalidate_user_responses(current_user.id)
             return deleted_user
 
     @classmethod
@@ -189,13 +230,13 @@ class UserService:
         cls,
         request: Request,
         user_id_to_delete: uuid.UUID,
-        uow: IUnitOfWork = UnitOfWork(),
+        uow: IUnitOfWork,
     ) -> bool:
         """
         1)get current token
         2)get decoded cur_user_id from token
         3)check cur_user privelegies
-        4)delete del_users token from TokenDB
+        4)delete all del_users sessions from the session store
         5)deactivate del_user
         """
         async with uow:
@@ -209,89 +250,170 @@ class UserService:
             if current_user.role != UserRole.SuperUserRole:
                 raise UserPrivilegesException
 
-            refresh_session = await uow.token.find_one_or_none_token(
+            await uow.token.delete_all_tokens_by_user_id(
                 user_id=user_id_to_delete
             )
-            if refresh_session:
-                await uow.token.logout_delete_token(refresh_session.id)
-                deleted_user = await uow.auth.activeness_switcher(
-                    user_id_to_delete, False
-                )
-                await uow.commit()
-                return deleted_user
+            deleted_user = await uow.auth.activeness_switcher(
+                user_id_to_delete, False
+            )
+            await invalidate_user_responses(user_id_to_delete)
+            await uow.commit()
+            token_claims_cache.invalidate_user(user_id_to_delete)
+            await invalidate_user_responses(user_id_to_delete)
+            return deleted_user
 
     @classmethod
-    async def refresh_token(
+    async def bulk_update_users(
         cls,
-        response: Response,
         request: Request,
-        uow: IUnitOfWork = UnitOfWork(),
-    ) -> Token:
+        bulk: UsersBulkUpdateRequest,
+        uow: IUnitOfWork,
+    ) -> UsersBulkUpdateResponse:
         """
-        get current refresh token
-        get session by refresh token
-            if session None:
-                raise InToEx
-            if time expired:
-                raise
-        get user by session.user_id
-            if user is None:
-                raise
-        create acctoken
-        create refresh token
-        update tokenDB
-        return Token
+        One UPDATE for all ids and one DELETE of their refresh sessions,
+        committed together. The caller's own id is skipped
         """
         async with uow:
-            refresh_token = request.cookies.get("refresh_token")
-
-            refresh_session = await uow.token.find_one_or_none_token(
-                refresh_token=refresh_token
+            token_dependency = await TokenUtils.token_user_dependency(request)
+            current_user = await uow.auth.find_one_or_none_user(
+                id=token_dependency.user_id
             )
-            if refresh_session is None:
-                raise InvalidTokenException
-            if TokenUtils.is_auth_session_expired(refresh_session):
-                await uow.token.logout_delete_token(id=refresh_session.id)
-                raise TokenExpiredException
+            if current_user.is_active == False:
+                raise UserNotActiveException
+            if current_user.role != UserRole.SuperUserRole:
+                raise UserPrivilegesException
 
-            user = await uow.auth.find_one_or_none_user(
-                id=refresh_session.user_id
+            target_ids = [
+                i for i in dict.fromkeys(bulk.ids) if i != current_user.id
+            ]
+            updated = await uow.auth.bulk_update_users(
+                target_ids, bulk.changes.model_dump(exclude_none=True)
             )
-            if user is None:
-                raise InvalidTokenException
+            updated_ids = [i.id for i in updated]
+            sessions_revoked = await uow.token.delete_all_tokens_by_user_ids(
+                updated_ids
+            )
+            await invalidate_user_responses(*updated_ids)
+            await uow.commit()
 
-            token_creator: TokenAccessRefreshCreate = (
-                await TokenUtils.access_refresh_tokens_creator(
-                    user_id=user.id,
-                    user_role=user.role,
-                    is_active=user.is_active,
+        for user_id in updated_ids:
+            token_claims_cache.invalidate_user(user_id)
+        await invalidate_user_responses(*updated_ids)
+
+        by_id = {i.id: i for i in updated}
+        results = []
+        for user_id in bulk.ids:
+            if user_id == current_user.id:
+                results.append(UserBulkResult(id=user_id, status="skipped"))
+            elif user_id in by_id:
+                results.append(
+                    UserBulkResult(
+                        id=user_id, status="updated", user=by_id[user_id]
+                    )
                 )
-            )
+            else:
+                results.append(
+                    UserBulkResult(id=user_id, status="not_found")
+                )
+        return UsersBulkUpdateResponse(
+            results=results,
+            updated=len(updated),
+            sessions_revoked=sessions_revoked,
+        )
 
-            updater = await uow.token.update_token(
-                token_id=refresh_session.id,
-                refresh_token=token_creator.refresh_token,
-                expires_in_seconds=token_creator.refresh_token_expires.total_seconds(),
+    @classmethod
+    async def refresh_token(
+        cls,
+        response: Response,
+        request: Request,
+        uow: IUnitOfWork,
+    ) -> Token:
+        """
+        Rotates the refresh token with one conditional UPDATE.
+        Zero rows: the token is unknown, expired or was already rotated.
+        A rotated token presented again is reuse, so the session it
+        belongs to is revoked.
+        Refreshes of the same token within the grace window share the
+        first one's result, or get 409 while it's still running.
+        A rotation is cut off after the grace's rotation timeout, which
+        the claim outlives, and gets 409 too
+        """
+        try:
+            refresh_token = str(uuid.UUID(request.cookies["refresh_token"]))
+        except (KeyError, ValueError):
+            raise InvalidTokenException
+
+        claimed = await refresh_grace.claim(refresh_token)
+        if not claimed:
+            token = await refresh_grace.wait(refresh_token)
+            if token is not None:
+                CookieUtils.access_refresh_cookies_setter(
+                    response, token.access_token, token.refresh_token
+                )
+                return token
+
+        try:
+            token = await asyncio.wait_for(
+                cls._rotate_refresh_token(refresh_token, uow),
+                refresh_grace.rotation_timeout,
             )
+        except TimeoutError as exc:
+            if claimed:
+                await refresh_grace.release(refresh_token)
+            raise RefreshInProgressException(
+                refresh_grace.POLL_INTERVAL
+            ) from exc
+        except BaseException:
+            if claimed:
+                await refresh_grace.release(refresh_token)
+            raise
+        if claimed:
+            await refresh_grace.store(refresh_token, token)
+
+        CookieUtils.access_refresh_cookies_setter(
+            response, token.access_token, token.refresh_token
+        )
+        return token
+
+    @staticmethod
+    async def _rotate_refresh_token(
+        refresh_token: str, uow: IUnitOfWork
+    ) -> Token:
+        new_refresh_token = TokenUtils.create_refresh_token()
+        refresh_token_expires = TokenUtils.token_expire_time()
 
-            CookieUtils.access_refresh_cookies_setter(
-                response,
-                token_creator.access_token,
-                token_creator.refresh_token,
+        async with uow:
+            rotation = await uow.token.rotate_token(
+                old_refresh_token=refresh_token,
+                new_refresh_token=new_refresh_token,
+                expires_in_seconds=refresh_token_expires.total_seconds(),
             )
+            if rotation is None:
+                revoked = await uow.token.revoke_token_family(refresh_token)
+                await uow.commit()
+                if any(
+                    str(i.refresh_token) == refresh_token for i in revoked
+                ):
+                    raise TokenExpiredException
+                for session in revoked:
+                    token_claims_cache.invalidate_user(session.user_id)
+                raise InvalidTokenException
             await uow.commit()
-            return Token(
-                access_token=token_creator.access_token,
-                refresh_token=token_creator.refresh_token,
-                token_type="bearer",
-            )
+
+        return Token(
+            access_token=TokenUtils.create_access_token(
+                rotation.user_id, rotation.role, rotation.is_active
+            ),
+            refresh_token=new_refresh_token,
+            token_type="bearer",
+        )
 
     @classmethod
     async def abort_all_sessions(
         cls,
         response: Response,
         request: Request,
-        uow: IUnitOfWork = UnitOfWork(),
+        uow: IUnitOfWork,
     ) -> list[AuthTokenORMSchema]:
         async with uow:
             token_dependency = await TokenUtils.token_user_dependency(request)
@@ -305,7 +427,7 @@ class UserService:
 
     @classmethod
     async def get_current_user(
-        cls, request: Request, uow: IUnitOfWork = UnitOfWork()
+        cls, request: Request, uow: IUnitOfWork
     ) -> User:
         """
         1)get current token
@@ -323,7 +445,7 @@ class UserService:
 
     @classmethod
     async def get_user_by_id(
-        cls, request: Request, user_id: int, uow: IUnitOfWork = UnitOfWork()
+        cls, request: Request, user_id: int, uow: IUnitOfWork
     ) -> User:
         """
         1)get current token
@@ -345,12 +467,48 @@ class UserService:
                 raise UserNotFoundException
             return user
 
+    @classmethod
+    async def get_users_by_ids(
+        cls, request: Request, batch: UsersBatchRequest, uow: IUnitOfWork
+    ) -> UsersBatchResponse:
+        """
+        Caller is checked once for the whole batch, items follow the
+        request order
+        """
+        async with uow:
+            token_dependency = await TokenUtils.token_user_dependency(request)
+            current_user = await uow.auth.find_one_or_none_user(
+                id=token_dependency.user_id
+            )
+            if current_user.is_active == False:
+                raise UserNotActiveException
+            if current_user.role != UserRole.SuperUserRole:
+                raise UserPrivilegesException
+
+            found = await uow.auth.find_users_by_ids(batch.ids)
+        return UsersBatchResponse(
+            items=[
+                UserBatchItem(
+                    id=user_id,
+                    found=str(user_id) in found,
+                    user=found.get(str(user_id)),
+                )
+                for user_id in batch.ids
+            ]
+        )
+
+    @staticmethod
+    async def _hash_new_password(user_update: UserUpdate) -> Optional[str]:
+        if user_update.password is None:
+            return None
+        return await PasswordStatic.get_password_hash(user_update.password)
+
     @classmethod
     async def update_user(
-        self,
+        cls,
         user_update: UserUpdate,
         request: Request,
-        uow: IUnitOfWork = UnitOfWork(),
+        uow: IUnitOfWork,
     ) -> User:
         """
         0)check superuser
@@ -370,18 +528,23 @@ class UserService:
             if current_user.role != UserRole.SuperUserRole:
                 raise UserPrivilegesException
 
-            user_update = await uow.auth.update_user(
-                current_user.id, user_update
+            updated_user = await uow.auth.update_user(
+                current_user.id,
+                user_update,
+                await cls._hash_new_password(user_update),
             )
-            return user_update
+            await invalidate_user_responses(current_user.id)
+            await uow.commit()
+            await invalidate_user_responses(current_user.id)
+            return updated_user
 
     @classmethod
     async def update_user_by_id(
-        self,
+        cls,
         user_id: uuid.UUID,
         user_update: UserUpdate,
         request: Request,
-        uow: IUnitOfWork = UnitOfWork(),
+        uow: IUnitOfWork,
     ) -> User:
         """
         0)check superuser
@@ -401,16 +564,23 @@ class UserService:
             if current_user.role != UserRole.SuperUserRole:
                 raise UserPrivilegesException
 
-            user_update = await uow.auth.update_user(user_id, user_update)
-            return user_update
+            updated_user = await uow.auth.update_user(
+                user_id,
+                user_update,
+                await cls._hash_new_password(user_update),
+            )
+            await invalidate_user_responses(user_id)
+            await uow.commit()
+            await invalidate_user_responses(user_id)
+            return updated_user
 
     @classmethod
     async def get_users_list(
-        self,
+        cls,
         request: Request,
         find_request: UsersFindRequest,
-        uow: IUnitOfWork = UnitOfWork(),
-    ) -> list[User]:
+        uow: IUnitOfWork,
+    ) -> UsersListResponse:
         async with uow:
             token_dependency = await TokenUtils.token_user_dependency(request)
             current_user = await uow.auth.find_one_or_none_user(
@@ -423,14 +593,17 @@ class UserService:
                 raise UserPrivilegesException
 
             users = await uow.auth.find_all_users(find_request)
-            if not users:
+            if not users.items:
                 raise UserNotFoundException
             return users
 
     @classmethod
     async def register_new_admin_user(
-        cls, user: UserCreate, uow: IUnitOfWork = UnitOfWork()
+        cls, user: UserCreate, uow: IUnitOfWork
     ) -> User:
+        hashed_password = await PasswordStatic.get_password_hash(
+            user.password
+        )
         async with uow:
             user_exist = await uow.auth.find_one_or_none_user(login=user.login)
             if user_exist:
@@ -439,9 +612,7 @@ class UserService:
                 db_user = await uow.auth.add_one_user(
                     user=UserCreateDB(
                         login=user.login,
-                        hashed_password=PasswordStatic.get_password_hash(
-                            user.password
-                        ),
+                        hashed_password=hashed_password,
                         role=UserRole.SuperUserRole,
                     )
                 )
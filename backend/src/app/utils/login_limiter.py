@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from src.app_config.app_settings import app_settings
+from src.app_config.config_redis import RedisRepository
+from src.app.repositories.exceptions import TooManyLoginAttemptsException
+from src.app.utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+# Sliding window log per key. KEYS are the windows to check, ARGV is
+# now (ms), window (ms), attempt id, then one limit per key. Returns the
+# ms each key has to wait, 0 for keys under their limit. The attempt is
+# recorded in every window only when all of them are 0
+_SLIDING_WINDOW = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local waits = {}
+local rejected = false
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    waits[i] = 0
+    if redis.call('ZCARD', key) >= tonumber(ARGV[3 + i]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        waits[i] = math.max(1, tonumber(oldest[2]) + window - now)
+        rejected = true
+    end
+end
+if not rejected then
+    for _, key in ipairs(KEYS) do
+        redis.call('ZADD', key, now, ARGV[3])
+        redis.call('PEXPIRE', key, window)
+    end
+end
+return waits
+"""
+
+
+class LoginRateLimiter:
+    """
+    Failed login attempts per login and per client IP in a sliding window
+    shared by all workers. Every attempt is recorded before bcrypt runs,
+    so parallel guesses can't all slip past the check, and a successful
+    one is forgiven afterwards. Keys rejected by Redis are remembered
+    locally until their window frees up, so a hot attacker costs no
+    round-trip. Fails open when Redis is unavailable
+    """
+
+    KEY_PREFIX = "login_limit:"
+
+    def __init__(
+        self,
+        per_login: int,
+        per_ip: int,
+        window: float,
+        local_size: int,
+    ):
+        self._per_login = per_login
+        self._per_ip = per_ip
+        self._window_ms = int(window * 1000)
+        self._local_size = local_size
+        self._blocked: OrderedDict[str, float] = OrderedDict()
+        self._redis: Optional[RedisRepository] = None
+        self._script = None
+
+        self.allowed = 0
+        self.rejected = 0
+        self.rejected_locally = 0
+        self.forgiven = 0
+        self.errors = 0
+
+    async def start(self, redis: RedisRepository) -> None:
+        self._redis = redis
+        self._script = redis.redis.register_script(_SLIDING_WINDOW)
+
+    async def stop(self) -> None:
+        self._redis = None
+
+    def _keys(self, login: str, client_ip: Optional[str]) -> Dict[str, int]:
+        digest = hashlib.sha1(login.strip().lower().encode()).hexdigest()
+        keys = {f"{self.KEY_PREFIX}login:{digest}": self._per_login}
+        if client_ip:
+            keys[f"{self.KEY_PREFIX}ip:{client_ip}"] = self._per_ip
+        return keys
+
+    def _blocked_for(self, keys: Dict[str, int]) -> float:
+        now = time.monotonic()
+        retry_after = 0.0
+        for key in keys:
+            deadline = self._blocked.get(key)
+            if deadline is None:
+                continue
+            if deadline <= now:
+                del self._blocked[key]
+            else:
+                retry_after = max(retry_after, deadline - now)
+        return retry_after
+
+    def _block(self, waits: Dict[str, float]) -> None:
+        """Only the keys over their own limit, not everything in the call"""
+        if self._local_size <= 0:
+            return
+        now = time.monotonic()
+        for key, wait in waits.items():
+            self._blocked[key] = now + wait
+            self._blocked.move_to_end(key)
+        while len(self._blocked) > self._local_size:
+            self._blocked.popitem(last=False)
+
+    async def check(
+        self, login: str, client_ip: Optional[str]
+    ) -> Optional[str]:
+        """
+        Counts the attempt, raises 429 when the login or the IP is over
+        its limit. The attempt id to forgive() once the password checks
+        out, None when nothing was recorded
+        """
+        keys = self._keys(login, client_ip)
+        retry_after = self._blocked_for(keys)
+        if retry_after:
+            self.rejected_locally += 1
+            raise TooManyLoginAttemptsException(retry_after)
+        if self._redis is None:
+            return None
+
+        attempt = uuid.uuid4().hex
+        try:
+            waits_ms = await self._script(
+                keys=list(keys),
+                args=[
+                    int(time.time() * 1000),
+                    self._window_ms,
+                    attempt,
+                    *keys.values(),
+                ],
+                client=self._redis.redis,
+            )
+        except RedisError:
+            self.errors += 1
+            logger.warning("Login rate limiter is unavailable")
+            return None
+
+        waits = {
+            key: int(wait_ms) / 1000
+            for key, wait_ms in zip(keys, waits_ms)
+            if int(wait_ms) > 0
+        }
+        if waits:
+            self.rejected += 1
+            self._block(waits)
+            raise TooManyLoginAttemptsException(max(waits.values()))
+        self.allowed += 1
+        return attempt
+
+    async def forgive(
+        self, login: str, client_ip: Optional[str], attempt: Optional[str]
+    ) -> None:
+        """Takes a successful attempt back out of its windows"""
+        if attempt is None or self._redis is None:
+            return
+        try:
+            async with self._redis.redis.pipeline(transaction=False) as pipe:
+                for key in self._keys(login, client_ip):
+                    pipe.zrem(key, attempt)
+                await pipe.execute()
+        except RedisError:
+            self.errors += 1
+            return
+        self.forgiven += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "rejected_locally": self.rejected_locally,
+            "forgiven": self.forgiven,
+            "locally_blocked_keys": len(self._blocked),
+            "errors": self.errors,
+        }
+
+
+login_limiter = LoginRateLimiter(
+    per_login=app_settings.LOGIN_RATE_LIMIT_PER_LOGIN,
+    per_ip=app_settings.LOGIN_RATE_LIMIT_PER_IP,
+    window=app_settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    local_size=app_settings.LOGIN_RATE_LIMIT_LOCAL_SIZE,
+)
+metrics.register("login_limiter", login_limiter.stats)
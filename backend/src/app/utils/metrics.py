@@ -0,0 +1,21 @@
+from typing import Any, Callable, Dict
+
+
+class MetricsRegistry:
+    """
+    Point-in-time stats of in-process components (caches, pools)
+    """
+
+    def __init__(self) -> None:
+        self._providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register(
+        self, name: str, provider: Callable[[], Dict[str, Any]]
+    ) -> None:
+        self._providers[name] = provider
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        return {name: provider() for name, provider in self._providers.items()}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import math
+from typing import Any, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from src.app_config.app_settings import app_settings
+from src.app_config.config_redis import RedisRepository
+from src.app.repositories.exceptions import RefreshInProgressException
+from src.app.schemas.auth import Token
+from src.app.utils.metrics import metrics
+
+
+class RefreshGrace:
+    """
+    Result of a refresh rotation kept in Redis for a few seconds, keyed by
+    the old refresh token. The first request claims the key, concurrent
+    tabs and retries wait for the pair it stores instead of hitting reuse
+    detection. A claim outlives the window by the rotation timeout, so it
+    can't expire under a rotation that is still running.
+    Redis failing on claim falls back to a plain rotation, failing while
+    a follower waits gets it a 409
+    """
+
+    KEY_PREFIX = "refresh_grace:"
+    PENDING = b"pending"
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, window: float, rotation_timeout: float):
+        self._window = window
+        self.rotation_timeout = rotation_timeout
+        self._claim_ttl = max(1, math.ceil(window + rotation_timeout))
+        self._redis: Optional[RedisRepository] = None
+
+        self.claims = 0
+        self.replays = 0
+        self.wait_timeouts = 0
+        self.wait_errors = 0
+
+    async def start(self, redis: RedisRepository) -> None:
+        self._redis = redis
+
+    async def stop(self) -> None:
+        self._redis = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None and self._window > 0
+
+    def _key(self, refresh_token: str) -> str:
+        digest = hashlib.sha256(refresh_token.encode()).hexdigest()
+        return self.KEY_PREFIX + digest
+
+    async def claim(self, refresh_token: str) -> bool:
+        """
+        True when this request should rotate, False when another one
+        already did or is doing it
+        """
+        if not self.enabled:
+            return True
+        try:
+            claimed = await self._redis.redis.set(
+                self._key(refresh_token),
+                self.PENDING,
+                nx=True,
+                ex=self._claim_ttl,
+            )
+        except RedisError:
+            return True
+        if claimed:
+            self.claims += 1
+        return bool(claimed)
+
+    async def wait(self, refresh_token: str) -> Optional[Token]:
+        """
+        Pair stored by the request holding the claim, None when it gave up.
+        Raises 409 when it didn't finish within the window, or when the
+        pair can't be read: the old token may be rotated any moment,
+        rotating it here would look like reuse
+        """
+        key = self._key(refresh_token)
+        deadline = asyncio.get_running_loop().time() + self._window
+        while asyncio.get_running_loop().time() < deadline:
+            try:
+                value = await self._redis.redis.get(key)
+            except RedisError:
+                self.wait_errors += 1
+                raise RefreshInProgressException(self.POLL_INTERVAL)
+            if value is None:
+                return None
+            if value != self.PENDING:
+                token = self._redis.serializer.loads(value)
+                if token is None:
+                    self.wait_errors += 1
+                    raise RefreshInProgressException(self.POLL_INTERVAL)
+                self.replays += 1
+                return token
+            await asyncio.sleep(self.POLL_INTERVAL)
+        self.wait_timeouts += 1
+        raise RefreshInProgressException(self._window)
+
+    async def store(self, refresh_token: str, token: Token) -> None:
+        if not self.enabled:
+            return
+        try:
+            await self._redis.add_one_obj(
+                self._key(refresh_token),
+                token,
+                ttl=max(1, round(self._window)),
+            )
+        except RedisError:
+            pass
+
+    async def release(self, refresh_token: str) -> None:
+        """Rotation failed, waiters fall back to their own attempt"""
+        if not self.enabled:
+            return
+        try:
+            await self._redis.remove_by_key(self._key(refresh_token))
+        except RedisError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": self._window,
+            "claim_ttl_seconds": self._claim_ttl,
+            "claims": self.claims,
+            "replays": self.replays,
+            "wait_timeouts": self.wait_timeouts,
+            "wait_errors": self.wait_errors,
+        }
+
+
+refresh_grace = RefreshGrace(
+    window=app_settings.REFRESH_GRACE_SECONDS,
+    rotation_timeout=app_settings.REFRESH_ROTATION_TIMEOUT_SECONDS,
+)
+metrics.register("refresh_grace", refresh_grace.stats)
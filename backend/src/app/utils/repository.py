@@ -1,21 +1,102 @@
+import json
 from abc import ABC
+from typing import AsyncIterator, Iterable, Mapping, Sequence, Type, TypeVar
 
 from fastapi import HTTPException, status
-from sqlalchemy import insert, select, update, delete, literal_column
+from sqlalchemy import insert, select, update, delete, literal_column, func, text
+from sqlalchemy import bindparam
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
 from src.app.repositories.exceptions import DataBase404Exception
 
 
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def uuid_array(values: Sequence) -> bindparam:
+    """A list of ids as a single uuid[] parameter, for `col = ANY(...)`"""
+    return bindparam(
+        None, list(values), type_=ARRAY(UUID(as_uuid=True)), unique=True
+    )
+
+
+class ExplainJSON(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) of a statement, its parameters stay bound and go
+    through their column types like in the statement itself
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Executable):
+        self.statement = statement
+
+
+@compiles(ExplainJSON)
+def _compile_explain_json(element: ExplainJSON, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
 class AbstractRepository(ABC):
     pass
 
 
 class SQLAlchemyRepository(AbstractRepository):
     model = None
+    # columns left out of stream_rows exports
+    export_exclude: tuple[str, ...] = ()
 
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @property
+    def columns(self) -> tuple:
+        return tuple(self.model.__table__.columns)
+
+    @property
+    def export_columns(self) -> tuple:
+        return tuple(
+            c for c in self.columns if c.name not in self.export_exclude
+        )
+
+    async def stream_rows(
+        self, fetch_size: int
+    ) -> AsyncIterator[Sequence[Mapping]]:
+        """
+        Whole table in id order through a server-side cursor, fetch_size
+        rows per partition, so memory doesn't grow with the table
+        """
+        stmt = (
+            select(*self.export_columns)
+            .order_by(self.model.id)
+            .execution_options(yield_per=fetch_size)
+        )
+        result = await self.session.stream(stmt)
+        async for partition in result.mappings().partitions():
+            yield partition
+
+    @staticmethod
+    def construct_all(
+        schema: Type[SchemaT], rows: Iterable[Mapping]
+    ) -> list[SchemaT]:
+        """
+        DTOs straight from result.mappings() without pydantic validation,
+        rows of our own tables already have the right types
+        """
+        fields = schema.model_fields.keys()
+        construct = schema.model_construct
+        items = []
+        keys = None
+        for row in rows:
+            if keys is None:
+                keys = [k for k in row.keys() if k in fields]
+            items.append(construct(**{k: row[k] for k in keys}))
+        return items
+
     async def add_one(self, data: dict):
         stmt = insert(self.model).values(**data).returning(literal_column("*"))
         res = await self.session.execute(stmt)
@@ -107,6 +188,39 @@ class SQLAlchemyRepository(AbstractRepository):
         return await self.session.get(self.model, id)
 
     async def get_count_by_param(self, **filter_by) -> int:
-        stmt = select(self.model).filter_by(**filter_by)
+        return await self.count(**filter_by)
+
+    async def count(self, *filter, **filter_by) -> int:
+        stmt = (
+            select(func.count())
+            .select_from(self.model)
+            .filter(*filter)
+            .filter_by(**filter_by)
+        )
         res = await self.session.execute(stmt)
-        return len(res.all())
\ No newline at end of file
+        return res.scalar_one()
+
+    async def estimate_count(self, *filter, **filter_by) -> int:
+        """
+        Planner estimate, no scan: pg_class.reltuples for the whole table,
+        EXPLAIN row estimate when filters are given
+        """
+        if not filter and not filter_by:
+            stmt = text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = to_regclass(:table_name)"
+            )
+            res = await self.session.execute(
+                stmt, {"table_name": self.model.__tablename__}
+            )
+            estimate = res.scalar_one_or_none()
+            if estimate is None or estimate < 0:  # never analyzed
+                return await self.count()
+            return estimate
+
+        stmt = select(self.model).filter(*filter).filter_by(**filter_by)
+        res = await self.session.execute(ExplainJSON(stmt))
+        plan = res.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
\ No newline at end of file
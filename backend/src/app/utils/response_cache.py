@@ -0,0 +1,181 @@
+import functools
+import hashlib
+import uuid
+from typing import Callable, Optional
+
+from fastapi import Request, Response, status
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from redis.exceptions import RedisError
+
+from src.app_config.app_settings import app_settings
+from src.app_config.config_redis import RedisRepository
+from src.app.schemas.auth import UserPublic
+from src.app.utils.static.auth_crypto import AuthContext
+from src.app.utils.unitofwork import IUnitOfWork
+
+
+PREFIX = "fastapi-cache"
+CACHE_STATUS_HEADER = "X-FastAPI-Cache"
+_PUBLIC_FIELDS = set(UserPublic.model_fields)
+
+
+def init_response_cache(repo: RedisRepository) -> None:
+    FastAPICache.init(
+        RedisBackend(repo.redis),
+        prefix=PREFIX,
+        expire=app_settings.RESPONSE_CACHE_TTL_SECONDS,
+    )
+
+
+def _backend() -> Optional[RedisBackend]:
+    """None until init_response_cache ran, e.g. in scripts and tests"""
+    try:
+        return FastAPICache.get_backend()
+    except AssertionError:
+        return None
+
+
+def rebind_response_cache(repo: RedisRepository) -> None:
+    """RedisManager swapped the client after a reconnect"""
+    backend = _backend()
+    if backend is not None:
+        backend.redis = repo.redis
+
+
+def _tag_key(user_id: uuid.UUID | str) -> str:
+    return f"{FastAPICache.get_prefix()}:tag:user:{user_id}"
+
+
+def _etag(payload: bytes | str) -> str:
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return f'W/"{hashlib.sha1(payload).hexdigest()}"'
+
+
+def _public(user) -> dict:
+    """Only the response fields reach Redis, never the internal DTO"""
+    # a User instance passes model_validate as is, `include` drops the hash
+    return UserPublic.model_validate(user, from_attributes=True).model_dump(
+        mode="json", include=_PUBLIC_FIELDS
+    )
+
+
+def _target_id(
+    user_id: Optional[uuid.UUID | str], caller_id: uuid.UUID
+) -> uuid.UUID:
+    """Canonical form, so keys and tags match invalidate_user_responses"""
+    if user_id is None:
+        return uuid.UUID(str(caller_id))
+    return uuid.UUID(str(user_id))
+
+
+async def _caller_still_allowed(uow: IUnitOfWork, caller) -> bool:
+    """
+    Hits skip the service body, so the caller is re-read the way it would
+    do: still active and still holding the role in the token
+    """
+    async with uow:
+        current = await uow.auth.find_one_or_none_user(id=caller.user_id)
+    return (
+        current is not None
+        and current.is_active
+        and current.role == caller.role
+    )
+
+
+def cache_user_response(namespace: str) -> Callable:
+    """
+    Caches a user read as UserPublic per (target user, caller, caller
+    role) and tags the entry by the target user id for
+    invalidate_user_responses. Responses carry a content ETag, a matching
+    If-None-Match gets 304.
+    The endpoint must take `request`, `response` and `uow`, target is
+    `user_id` or the caller. Hits are served only while the caller is
+    still active with the role from the token
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs["request"]
+            response: Response = kwargs["response"]
+            backend = _backend()
+            if (
+                backend is None
+                or not FastAPICache.get_enable()
+                or request.headers.get("Cache-Control")
+                in ("no-store", "no-cache")
+            ):
+                return await func(*args, **kwargs)
+
+            caller = await AuthContext.from_request(request)
+            try:
+                target_id = _target_id(kwargs.get("user_id"), caller.user_id)
+            except ValueError:
+                return await func(*args, **kwargs)
+            key = (
+                f"{FastAPICache.get_prefix()}:{namespace}:{target_id}:"
+                f"{caller.user_id}:{caller.role.value}"
+            )
+            coder = FastAPICache.get_coder()
+            expire = FastAPICache.get_expire()
+
+            try:
+                cached = await backend.get(key)
+            except RedisError:
+                cached = None
+
+            if cached is None:
+                result = _public(await func(*args, **kwargs))
+                cached = coder.encode(result)
+                try:
+                    await backend.set(key, cached, expire)
+                    await backend.redis.sadd(_tag_key(target_id), key)
+                    await backend.redis.expire(_tag_key(target_id), expire)
+                except RedisError:
+                    pass
+                cache_status = "MISS"
+            elif not await _caller_still_allowed(kwargs["uow"], caller):
+                # the service body re-checks the caller and raises
+                return await func(*args, **kwargs)
+            else:
+                result = coder.decode(cached)
+                cache_status = "HIT"
+
+            etag = _etag(cached)
+            headers = {
+                "ETag": etag,
+                "Cache-Control": f"private, max-age={expire}",
+                CACHE_STATUS_HEADER: cache_status,
+            }
+            if request.headers.get("if-none-match") == etag:
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+                )
+            response.headers.update(headers)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate_user_responses(*user_ids: uuid.UUID | str) -> None:
+    """
+    Call it after the write and again after the commit, like the user
+    cache: a read in between can store the old row again
+    """
+    backend = _backend()
+    if not user_ids or backend is None:
+        return
+    tags = [_tag_key(uuid.UUID(str(user_id))) for user_id in user_ids]
+    try:
+        async with backend.redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.smembers(tag)
+            members = await pipe.execute()
+        keys = [key for tagged in members for key in tagged]
+        await backend.redis.unlink(*tags, *keys)
+    except RedisError:
+        pass
@@ -0,0 +1,21 @@
+from typing import Mapping, Optional, Sequence
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def model_response(
+    content: BaseModel | Sequence[BaseModel],
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> ORJSONResponse:
+    """
+    Serializes DTOs once with orjson. FastAPI returns Response objects as
+    is, so the route's response_model is used for the docs only and isn't
+    validated against a second time
+    """
+    if isinstance(content, BaseModel):
+        data = content.model_dump()
+    else:
+        data = [i.model_dump() for i in content]
+    return ORJSONResponse(data, status_code=status_code, headers=headers)
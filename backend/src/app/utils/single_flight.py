@@ -0,0 +1,128 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from src.app_config.app_settings import app_settings
+from src.app.utils.metrics import metrics
+
+
+WRITES_KEY = "has_writes"
+REPLICA_KEY = "replica"
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_writes(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _reset_writes(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(WRITES_KEY, None)
+
+
+class SingleFlight:
+    """
+    Identical reads in flight at the same time within one worker share
+    the first caller's round-trip. Followers wait up to the key's timeout
+    and run their own call if the leader is slow or fails
+    """
+
+    def __init__(self, enabled: bool, timeout: float):
+        self.enabled = enabled
+        self._timeout = timeout
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.bypassed = 0
+        self.timeouts = 0
+        self.fallbacks = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            try:
+                ok, result = await asyncio.wait_for(
+                    asyncio.shield(flight), timeout or self._timeout
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                ok = False
+            if ok:
+                return result
+            self.fallbacks += 1
+            return await func()
+
+        # resolved with (ok, result), a failure is never shared
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[key] = flight
+        self.leaders += 1
+        try:
+            result = await func()
+        except BaseException:
+            flight.set_result((False, None))
+            raise
+        else:
+            flight.set_result((True, result))
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.leaders + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "inflight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": self.coalesced / calls if calls else 0.0,
+            "bypassed": self.bypassed,
+            "timeouts": self.timeouts,
+            "fallbacks": self.fallbacks,
+        }
+
+
+single_flight = SingleFlight(
+    enabled=app_settings.SINGLE_FLIGHT_ENABLED,
+    timeout=app_settings.SINGLE_FLIGHT_TIMEOUT_SECONDS,
+)
+metrics.register("single_flight", single_flight.stats)
+
+
+def coalesced(namespace: str, timeout: Optional[float] = None) -> Callable:
+    """
+    For repository finders taking keyword filters. Calls with filter
+    expressions, or on a session that already wrote in its transaction,
+    go straight to the database since they must see their own writes
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(self, *filter, **filter_by):
+            info = self.session.info
+            if not single_flight.enabled or filter or info.get(WRITES_KEY):
+                single_flight.bypassed += 1
+                return await func(self, *filter, **filter_by)
+            key = (
+                namespace,
+                info.get(REPLICA_KEY, False),
+                tuple(sorted((k, str(v)) for k, v in filter_by.items())),
+            )
+            return await single_flight.do(
+                key, lambda: func(self, **filter_by), timeout
+            )
+
+        return wrapper
+
+    return decorator
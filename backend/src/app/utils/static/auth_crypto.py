@@ -2,16 +2,19 @@ from typing import Dict, Optional, Callable
 import bcrypt
 import uuid
 from datetime import timedelta, datetime, timezone
-from jose import jwt
+from jose import jwt, ExpiredSignatureError, JWTError
 
-from fastapi import Request, Response
+from fastapi import HTTPException, Request, Response
 from fastapi.openapi.models import OAuthFlows as OAuthFlowsModel
 from fastapi.security import OAuth2
 from fastapi.security.utils import get_authorization_scheme_param
 
 from src.app_config.app_settings import app_settings
+from src.app.utils.static.password_pool import password_pool
+from src.app.utils.static.token_cache import token_claims_cache
 from src.app.repositories.exceptions import (
     InvalidTokenException,
+    TokenExpiredException,
     UserNotAuthorizedException,
     UserPrivilegesException,
     UserNotActiveException,
@@ -30,9 +33,7 @@ def role_access(allowed_roles: set):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             request = kwargs.get("request")
-            user_access_cookie = await TokenUtils.token_user_dependency(
-                request
-            )
+            user_access_cookie = await AuthContext.from_request(request)
             if user_access_cookie.role not in allowed_roles:
                 raise UserPrivilegesException()
 
@@ -48,9 +49,7 @@ def role_active_access(allowed_roles: set):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             request = kwargs.get("request")
-            user_access_cookie = await TokenUtils.token_user_dependency(
-                request
-            )
+            user_access_cookie = await AuthContext.from_request(request)
             if user_access_cookie.role not in allowed_roles:
                 raise UserPrivilegesException()
             if not bool(user_access_cookie.is_active):
@@ -94,12 +93,16 @@ class CryptoUserStatic(OAuth2):
 
 class PasswordStatic:
     @staticmethod
-    def is_valid_password(plain_password: str, hashed_password: str) -> bool:
-        return PasswordStatic._verify_password(plain_password, hashed_password)
+    async def is_valid_password(
+        plain_password: str, hashed_password: str
+    ) -> bool:
+        return await password_pool.run(
+            PasswordStatic._verify_password, plain_password, hashed_password
+        )
 
     @staticmethod
-    def get_password_hash(password: str) -> str:
-        return PasswordStatic._hash_password(password)
+    async def get_password_hash(password: str) -> str:
+        return await password_pool.run(PasswordStatic._hash_password, password)
 
     @staticmethod
     def _verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -135,11 +138,12 @@ class TokenUtils:
 
     @staticmethod
     def is_auth_session_expired(access_session: AuthTokenORMSchema):
-        return datetime.now(
-            timezone.utc
-        ) >= access_session.created_at + timedelta(
-            seconds=access_session.expires_in
-        )
+        expires_at = access_session.expires_at
+        if expires_at is None:
+            expires_at = access_session.created_at + timedelta(
+                seconds=access_session.expires_in
+            )
+        return datetime.now(timezone.utc) >= expires_at
 
     @staticmethod
     def create_refresh_token() -> str:
@@ -153,25 +157,39 @@ class TokenUtils:
     async def token_user_dependency(
         request: Request,
     ) -> DependentToken:
-        token = await oauth2_scheme(request)
-        if token == False:
-            raise UserNotAuthorizedException
+        return await AuthContext.from_request(request)
 
-        payload = jwt.decode(
-            token, app_settings.SECRET_KEY, algorithms=[app_settings.ALGORITHM]
-        )
+    @staticmethod
+    def decode_access_token(token: str) -> DependentToken:
+        cached = token_claims_cache.get(token)
+        if cached is not None:
+            return cached
+
+        try:
+            payload = jwt.decode(
+                token,
+                app_settings.SECRET_KEY,
+                algorithms=[app_settings.ALGORITHM],
+            )
+        except ExpiredSignatureError:
+            raise TokenExpiredException
+        except JWTError:
+            raise InvalidTokenException
         user_id = payload.get("sub")
         role = payload.get("role")
         is_active = payload.get("is_active")
         if user_id is None or role is None or is_active is None:
             raise InvalidTokenException
 
-        return DependentToken(
+        claims = DependentToken(
             token=token,
             user_id=user_id,
             role=UserRole(role),
             is_active=is_active,
+            exp=payload.get("exp"),
         )
+        token_claims_cache.put(claims)
+        return claims
 
     @staticmethod
     async def access_refresh_tokens_creator(
@@ -186,6 +204,61 @@ class TokenUtils:
         )
 
 
+class AuthContext:
+    """
+    Access token claims of the current request, decoded once and kept on
+    request.state. Later calls get the same claims or the same error,
+    which caps decode work at one per request without a counter
+    """
+
+    def __init__(self) -> None:
+        self._token: Optional[DependentToken] = None
+        self._error: Optional[HTTPException] = None
+
+    @property
+    def is_resolved(self) -> bool:
+        return self._token is not None or self._error is not None
+
+    @staticmethod
+    def of(request: Request) -> "AuthContext":
+        context = getattr(request.state, "auth_context", None)
+        if context is None:
+            context = AuthContext()
+            request.state.auth_context = context
+        return context
+
+    @classmethod
+    async def from_request(cls, request: Request) -> DependentToken:
+        context = cls.of(request)
+        if context.is_resolved:
+            return context.resolve(None)
+        return context.resolve(await oauth2_scheme(request) or None)
+
+    @classmethod
+    def from_token(cls, request: Request, token: str) -> DependentToken:
+        """
+        For callers that keep the "Bearer ..." token outside the cookie
+        (admin session)
+        """
+        _, param = get_authorization_scheme_param(token)
+        return cls.of(request).resolve(param or None)
+
+    def resolve(self, token: Optional[str]) -> DependentToken:
+        if self._token is not None:
+            return self._token
+        if self._error is not None:
+            raise self._error
+
+        try:
+            if not token:
+                raise UserNotAuthorizedException
+            self._token = TokenUtils.decode_access_token(token)
+        except HTTPException as exc:
+            self._error = exc
+            raise
+        return self._token
+
+
 class CookieUtils:
     @staticmethod
     def cookie_setter(response: Response, token: str, name: str):
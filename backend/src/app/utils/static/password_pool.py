@@ -0,0 +1,59 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.app_config.app_settings import app_settings
+from src.app.repositories.exceptions import PasswordPoolBusyException
+
+
+class PasswordPool:
+    """
+    Process pool for bcrypt work, keeps hashing off the event loop
+    """
+
+    def __init__(self, workers: int = 0, max_queue: int = 0):
+        if not workers:
+            workers = max(1, (os.cpu_count() or 1) // max(1, app_settings.WORKERS))
+        self._workers = workers
+        self._max_pending = workers + max_queue
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Runs func in the pool, fails fast with 503 when the queue is full
+        """
+        if self._pending >= self._max_pending:
+            raise PasswordPoolBusyException
+        self.start()
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+        finally:
+            self._pending -= 1
+
+
+password_pool = PasswordPool(
+    workers=app_settings.PASSWORD_POOL_WORKERS,
+    max_queue=app_settings.PASSWORD_POOL_MAX_QUEUE,
+)
@@ -0,0 +1,96 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.app_config.app_settings import app_settings
+from src.app.schemas.auth import DependentToken
+from src.app.utils.metrics import metrics
+
+
+class TokenClaimsCache:
+    """
+    Per-worker LRU of verified access token claims keyed by JWT signature.
+    An entry never outlives the token's exp
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, DependentToken]] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return token.rsplit(".", 1)[-1]
+
+    def get(self, token: str) -> Optional[DependentToken]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        deadline, claims = entry
+        if deadline <= time.time() or claims.token != token:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, claims: DependentToken) -> None:
+        if self._max_size <= 0:
+            return
+        deadline = time.time() + self._ttl
+        if claims.exp is not None:
+            deadline = min(deadline, claims.exp)
+
+        self._entries[self._key(claims.token)] = (deadline, claims)
+        self._entries.move_to_end(self._key(claims.token))
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_user(self, user_id: uuid.UUID | str) -> None:
+        user_id = str(user_id)
+        stale = [
+            key
+            for key, (_, claims) in self._entries.items()
+            if str(claims.user_id) == user_id
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+token_claims_cache = TokenClaimsCache(
+    max_size=app_settings.TOKEN_CACHE_SIZE,
+    ttl=app_settings.TOKEN_CACHE_TTL_SECONDS,
+)
+metrics.register("token_claims_cache", token_claims_cache.stats)
@@ -1,11 +1,20 @@
 from abc import ABC, abstractmethod
 from typing import Type
 
+from src.app_config.app_settings import app_settings
 from src.database.database import database_accessor
+from src.app.utils.single_flight import REPLICA_KEY
+from src.app.utils.user_cache import user_cache
+from src.redisrepo.dependencies import redis_manager
 
 
 from ..repositories.metauser.auth_user import AuthRepository
-from ..repositories.metauser.auth_token import AuthTokenRepository
+from ..repositories.metauser.auth_token import (
+    AuthTokenRepository,
+    ITokenRepository,
+)
+from ..repositories.metauser.auth_token_redis import RedisAuthTokenRepository
+from ..repositories.metauser.client import ClientRepository
 from ...database.db_accessor import DatabaseAccessor
 
 
@@ -14,7 +23,8 @@ class IUnitOfWork(ABC):
     """Interface for Unit of Work pattern."""
 
     auth: Type[AuthRepository]
-    token: Type[AuthTokenRepository]
+    token: ITokenRepository
+    client: Type[ClientRepository]
 
     @abstractmethod
     def __init__(self):
@@ -37,19 +47,48 @@ class IUnitOfWork(ABC):
         """Rollback changes."""
 
 
-class UnitOfWork:
-    def __init__(self, database_accessor_p: None | DatabaseAccessor = None):
+class UnitOfWork(IUnitOfWork):
+    """
+    One instance per request. The session is created on enter, but a pooled
+    connection is checked out only when a repository runs its first query.
+
+    read_only sends queries to a replica unless read_your_writes asks to
+    see this client's own fresh writes, which only the primary guarantees
+    """
+
+    def __init__(
+        self,
+        database_accessor_p: None | DatabaseAccessor = None,
+        read_only: bool = False,
+        read_your_writes: bool = False,
+    ):
         if database_accessor_p is None:
             database_accessor_p = database_accessor
-        self.session_fabric = database_accessor_p.get_async_session_maker()
+        self._database_accessor = database_accessor_p
+        self.read_only = read_only
+        self.read_your_writes = read_your_writes
+        self.session = None
 
-    async def __aenter__(self):
+    async def __aenter__(self) -> "UnitOfWork":
         """Enter the context manager."""
-        self.session = self.session_fabric()
-
+        if self.read_only and not self.read_your_writes:
+            session_fabric = self._database_accessor.get_read_session_maker()
+        else:
+            session_fabric = self._database_accessor.get_async_session_maker()
+        self.session = session_fabric()
+        self.session.info[REPLICA_KEY] = (
+            self.read_only and not self.read_your_writes
+        )
 
         self.auth = AuthRepository(self.session)
-        self.token = AuthTokenRepository(self.session)
+        self.client = ClientRepository(self.session)
+        if app_settings.SESSION_STORE_BACKEND == "redis":
+            self.token = RedisAuthTokenRepository(
+                redis_manager.repo, self.auth
+            )
+        else:
+            self.token = AuthTokenRepository(self.session)
+        return self
 
     async def __aexit__(self, *args) -> None:
         await self.rollback()
@@ -57,6 +96,22 @@ class UnitOfWork:
 
     async def commit(self) -> None:
         await self.session.commit()
+        await user_cache.invalidate_many(
+            self.session.info.pop("invalidated_users", ())
+        )
 
     async def rollback(self) -> None:
-        await self.session.rollback()
\ No newline at end of file
+        await self.session.rollback()
+
+
+def get_uow() -> IUnitOfWork:
+    return UnitOfWork()
+
+
+def get_read_uow() -> IUnitOfWork:
+    return UnitOfWork(read_only=True)
+
+
+def get_read_your_writes_uow() -> IUnitOfWork:
+    """For reads of the caller's own data, right after they changed it"""
+    return UnitOfWork(read_only=True, read_your_writes=True)
@@ -0,0 +1,228 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from redis.exceptions import RedisError
+
+from src.app_config.app_settings import app_settings
+from src.app_config.config_redis import RedisRepository
+from src.app.schemas.auth import User
+from src.app.utils.metrics import metrics
+
+
+class UserCache:
+    """
+    Users by id: per-worker LRU in front of a Redis cache shared by all
+    workers. Invalidations are broadcast to the other workers over pub/sub.
+    Cached users carry no hashed_password, like the by-id reads that fill
+    the cache
+    """
+
+    KEY_PREFIX = "user_cache:v2:"
+    CHANNEL = "user_cache:invalidate"
+
+    def __init__(self, max_size: int, local_ttl: float, redis_ttl: int):
+        self._max_size = max_size
+        self._local_ttl = local_ttl
+        self._redis_ttl = redis_ttl
+        self._local: OrderedDict[str, tuple[float, User]] = OrderedDict()
+        self._redis: Optional[RedisRepository] = None
+        self._listener: Optional[asyncio.Task] = None
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations_sent = 0
+        self.invalidations_received = 0
+        self.last_invalidation_lag = 0.0
+        self.max_invalidation_lag = 0.0
+
+    async def start(self, redis: RedisRepository) -> None:
+        self._redis = redis
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        self._redis = None
+
+    def _get_local(self, key: str) -> Optional[User]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        deadline, user = entry
+        if deadline <= time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return user
+
+    def _set_local(self, key: str, user: User) -> None:
+        if self._max_size <= 0:
+            return
+        self._local[key] = (time.monotonic() + self._local_ttl, user)
+        self._local.move_to_end(key)
+        while len(self._local) > self._max_size:
+            self._local.popitem(last=False)
+
+    async def get(self, user_id: uuid.UUID | str) -> Optional[User]:
+        key = str(user_id)
+        user = self._get_local(key)
+        if user is not None:
+            self.local_hits += 1
+            return user
+
+        if self._redis is not None:
+            try:
+                user = await self._redis.get_one_obj(self.KEY_PREFIX + key)
+            except RedisError:
+                user = None
+            if user is not None:
+                self.redis_hits += 1
+                self._set_local(key, user)
+                return user
+
+        self.misses += 1
+        return None
+
+    async def get_many(
+        self, user_ids: Iterable[uuid.UUID | str]
+    ) -> Dict[str, User]:
+        """Hits by str(id), local first and one MGET for the rest"""
+        found: Dict[str, User] = {}
+        remote = []
+        for user_id in user_ids:
+            key = str(user_id)
+            user = self._get_local(key)
+            if user is not None:
+                self.local_hits += 1
+                found[key] = user
+            else:
+                remote.append(key)
+
+        if remote and self._redis is not None:
+            try:
+                users = await self._redis.get_many_obj(
+                    [self.KEY_PREFIX + key for key in remote]
+                )
+            except RedisError:
+                users = [None] * len(remote)
+            for key, user in zip(remote, users):
+                if user is not None:
+                    self.redis_hits += 1
+                    self._set_local(key, user)
+                    found[key] = user
+                else:
+                    self.misses += 1
+        else:
+            self.misses += len(remote)
+        return found
+
+    async def set_many(self, users: Iterable[User]) -> None:
+        objs = {}
+        for user in map(self._strip, users):
+            self._set_local(str(user.id), user)
+            objs[self.KEY_PREFIX + str(user.id)] = user
+        if self._redis is not None:
+            try:
+                await self._redis.add_many_obj(objs, ttl=self._redis_ttl)
+            except RedisError:
+                pass
+
+    @staticmethod
+    def _strip(user: User) -> User:
+        """Password hashes stay in the DB, login reads them from there"""
+        if user.hashed_password is None:
+            return user
+        return user.model_copy(update={"hashed_password": None})
+
+    async def set(self, user: User) -> None:
+        user = self._strip(user)
+        key = str(user.id)
+        self._set_local(key, user)
+        if self._redis is not None:
+            try:
+                await self._redis.add_one_obj(
+                    self.KEY_PREFIX + key, user, ttl=self._redis_ttl
+                )
+            except RedisError:
+                pass
+
+    async def invalidate(self, user_id: uuid.UUID | str) -> None:
+        key = str(user_id)
+        self._local.pop(key, None)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.remove_by_key(self.KEY_PREFIX + key)
+            await self._redis.publish(self.CHANNEL, f"{key}:{time.time()}")
+            self.invalidations_sent += 1
+        except RedisError:
+            pass
+
+    async def invalidate_many(
+        self, user_ids: Iterable[uuid.UUID | str]
+    ) -> None:
+        """invalidate() for a batch in one pipelined round-trip"""
+        keys = [str(i) for i in user_ids]
+        if not keys:
+            return
+        for key in keys:
+            self._local.pop(key, None)
+        if self._redis is None:
+            return
+        sent_at = time.time()
+        try:
+            async with self._redis.redis.pipeline(transaction=False) as pipe:
+                pipe.unlink(*(self.KEY_PREFIX + key for key in keys))
+                for key in keys:
+                    pipe.publish(self.CHANNEL, f"{key}:{sent_at}")
+                await pipe.execute()
+            self.invalidations_sent += len(keys)
+        except RedisError:
+            pass
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for data in self._redis.listen(self.CHANNEL):
+                    key, sent_at = data.decode().rsplit(":", 1)
+                    self._local.pop(key, None)
+                    self.invalidations_received += 1
+                    self.last_invalidation_lag = time.time() - float(sent_at)
+                    self.max_invalidation_lag = max(
+                        self.max_invalidation_lag, self.last_invalidation_lag
+                    )
+            except RedisError:
+                # a real disconnect, idle reads don't end up here. Entries
+                # cached until we resubscribe may have missed evictions
+                await asyncio.sleep(1)
+                self._local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        hits = self.local_hits + self.redis_hits
+        return {
+            "local_size": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "staleness_window_seconds": self._local_ttl,
+            "invalidations_sent": self.invalidations_sent,
+            "invalidations_received": self.invalidations_received,
+            "last_invalidation_lag_seconds": self.last_invalidation_lag,
+            "max_invalidation_lag_seconds": self.max_invalidation_lag,
+        }
+
+
+user_cache = UserCache(
+    max_size=app_settings.USER_CACHE_SIZE,
+    local_ttl=app_settings.USER_CACHE_LOCAL_TTL_SECONDS,
+    redis_ttl=app_settings.USER_CACHE_TTL_SECONDS,
+)
+metrics.register("user_cache", user_cache.stats)
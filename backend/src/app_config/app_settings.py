@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import computed_field
 
@@ -21,6 +21,30 @@ class AppSettings(BaseSettings):
     ALGORITHM: str
     REFRESH_TOKEN_EXPIRE_DAYS: int
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    PASSWORD_POOL_WORKERS: int = 0
+    PASSWORD_POOL_MAX_QUEUE: int = 32
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 30
+    USER_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    SESSION_REAPER_INTERVAL_SECONDS: float = 60
+    SESSION_REAPER_BATCH_SIZE: int = 1000
+    SESSION_REAPER_BATCH_PAUSE_SECONDS: float = 0.1
+    SESSION_STORE_BACKEND: Literal["sql", "redis"] = "sql"
+    REFRESH_GRACE_SECONDS: float = 5
+    REFRESH_ROTATION_TIMEOUT_SECONDS: float = 5
+    EXPORT_FETCH_SIZE: int = 2000
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_TIMEOUT_SECONDS: float = 1.0
+    LOGIN_RATE_LIMIT_PER_LOGIN: int = 10
+    LOGIN_RATE_LIMIT_PER_IP: int = 100
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = 60
+    LOGIN_RATE_LIMIT_LOCAL_SIZE: int = 10000
+    # reverse proxies whose X-Forwarded-For uvicorn applies to
+    # request.client, comma separated addresses or networks
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
     origins: List[str] = [
         "http://localhost:3000",
         "http://localhost:3300",
@@ -1,4 +1,5 @@
 from functools import cached_property
+from typing import List, Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import computed_field
 
@@ -17,7 +18,12 @@ class DBSettings(BaseSettings):
     PASS: str
     DB_POOL_SIZE: int
     DB_MAX_OVERFLOW: int
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: Optional[float] = None
     DB_URL: str
+    REPLICA_HOSTS: List[str] = []
+    DB_CONNECTION_MODE: Literal["direct", "pgbouncer"] = "direct"
+    DB_STATEMENT_CACHE_SIZE: int = 100
 
     @cached_property
     def db_settings(self):
@@ -30,6 +36,14 @@ class DBSettings(BaseSettings):
             f"@{self.HOST}:{self.PORT}/{self.NAME}"
         )
 
+    def replica_dsn_async(self, host: str) -> str:
+        if ":" not in host:
+            host = f"{host}:{self.PORT}"
+        return (
+            f"postgresql+asyncpg://{self.USER}:{self.PASS}"
+            f"@{host}/{self.NAME}"
+        )
+
     @cached_property
     def dsn_sync(self):
         return (
@@ -1,7 +1,19 @@
+import re
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from redis import asyncio as aioredis
-from typing import Dict, Optional, List, Any
-import pickle
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from typing import AsyncIterator, Dict, Optional, List, Any
+
+from src.app_config.redis_codecs import RedisSerializer, build_serializer
+
+
+_GLOB_SPECIAL = re.compile(r"([*?\[\]\\])")
+
+
+def escape_glob(pattern: str) -> str:
+    """Literal text for a MATCH pattern, keys may contain * ? [ ] or \\"""
+    return _GLOB_SPECIAL.sub(r"\\\1", pattern)
 
 
 class RedisSettings(BaseSettings):
@@ -13,24 +25,67 @@ class RedisSettings(BaseSettings):
         env_prefix="REDIS_",
     )
     endpoint: str
+    codec: str = "orjson"
+    compress_threshold: int = 1024
+    # temporary, for values pickled before the codecs, off once they expired
+    legacy_pickle: bool = False
+    max_connections: int = 50
+    socket_timeout: float = 1.0
+    health_check_interval: int = 15
+    reconnect_backoff_max: float = 30.0
 
 
 class RedisRepository:
-    def __init__(self, redis: aioredis.Redis) -> None:
+    SCAN_COUNT: int = 1000
+    PUBSUB_POLL_TIMEOUT: float = 0.5
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        serializer: Optional[RedisSerializer] = None,
+    ) -> None:
         self.redis = redis
+        self.serializer = serializer or build_serializer("orjson", 0)
+
+    @classmethod
+    def create(cls, redis_settings: RedisSettings) -> "RedisRepository":
+        """
+        Client over a bounded connection pool, connects lazily
+        """
+        pool = aioredis.ConnectionPool.from_url(
+            redis_settings.endpoint,
+            max_connections=redis_settings.max_connections,
+            socket_timeout=redis_settings.socket_timeout,
+            socket_connect_timeout=redis_settings.socket_timeout,
+            health_check_interval=redis_settings.health_check_interval,
+        )
+        return cls(
+            aioredis.Redis(connection_pool=pool),
+            build_serializer(
+                redis_settings.codec,
+                redis_settings.compress_threshold,
+                redis_settings.legacy_pickle,
+            ),
+        )
 
     @classmethod
     async def connect(cls) -> "RedisRepository":
-        redis_settings = RedisSettings()
-        redis_endpoint = redis_settings.endpoint
-        try:
-            redis = await aioredis.from_url(redis_endpoint)
-            if not await redis.ping():
-                raise ValueError("Redis connection failed")
-            return cls(redis)
-        except aioredis.RedisError as e:
-            print(e)
-            return e
+        repo = cls.create(RedisSettings())
+        if not await repo.ping():
+            raise aioredis.ConnectionError("Redis connection failed")
+        return repo
+
+    async def ping(self) -> bool:
+        return await self.redis.ping()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        pool = self.redis.connection_pool
+        return {
+            "max_connections": pool.max_connections,
+            "created": pool._created_connections,
+            "in_use": len(pool._in_use_connections),
+            "available": len(pool._available_connections),
+        }
 
     async def add_one(
         self, key: str, value: str, ttl: Optional[int] = None
@@ -46,7 +101,7 @@ class RedisRepository:
         obj_value: Any,
         ttl: Optional[int] = None,
     ) -> None:
-        serialized_obj = pickle.dumps(obj_value)
+        serialized_obj = self.serializer.dumps(obj_value)
         if ttl:
             await self.redis.set(key_obj, serialized_obj, ex=ttl)
         else:
@@ -58,40 +113,104 @@ class RedisRepository:
     async def get_one_obj(self, key_obj: str) -> Optional[Any]:
         serialized_obj = await self.redis.get(key_obj)
         if serialized_obj:
-            obj = pickle.loads(serialized_obj)
-            return obj
+            return self.serializer.loads(serialized_obj)
         else:
             return None
 
+    async def get_many_obj(self, keys_obj: List[str]) -> List[Optional[Any]]:
+        """One MGET, None for missing keys"""
+        if not keys_obj:
+            return []
+        values = await self.redis.mget(keys_obj)
+        return [self.serializer.loads(v) if v else None for v in values]
+
+    async def add_many_obj(
+        self, objs: Dict[str, Any], ttl: Optional[int] = None
+    ) -> None:
+        """SET per key in one pipelined round-trip"""
+        if not objs:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key_obj, obj_value in objs.items():
+                pipe.set(key_obj, self.serializer.dumps(obj_value), ex=ttl)
+            await pipe.execute()
+
+    async def iter_keys_by_prefix(
+        self, prefix: str, count: int = SCAN_COUNT
+    ) -> AsyncIterator[List[bytes]]:
+        """
+        Pages of keys from non-blocking SCAN, unlike KEYS it never stalls
+        the server
+        """
+        cursor = 0
+        while True:
+            cursor, keys = await self.redis.scan(
+                cursor, match=f"{escape_glob(prefix)}*", count=count
+            )
+            if keys:
+                yield keys
+            if cursor == 0:
+                break
+
+    async def iter_by_prefix(
+        self, prefix: str, count: int = SCAN_COUNT
+    ) -> AsyncIterator[tuple[bytes, Optional[bytes]]]:
+        async for keys in self.iter_keys_by_prefix(prefix, count):
+            values = await self.redis.mget(keys)
+            for key, value in zip(keys, values):
+                yield key, value
+
+    async def iter_obj_by_prefix(
+        self, prefix: str, count: int = SCAN_COUNT
+    ) -> AsyncIterator[tuple[bytes, Optional[Any]]]:
+        async for key, serialized_obj in self.iter_by_prefix(prefix, count):
+            if serialized_obj:
+                yield key, self.serializer.loads(serialized_obj)
+            else:
+                yield key, None
+
     async def get_all_by_prefix(self, prefix: str) -> Dict[str, Optional[str]]:
-        keys: List[str] = await self.redis.keys(f"{prefix}*")
-        values: Dict[str, Optional[str]] = {
-            key: await self.redis.get(key) for key in keys
-        }
-        return values
+        return {key: value async for key, value in self.iter_by_prefix(prefix)}
 
     async def get_all_obj_by_prefix(
         self, prefix: str
     ) -> Dict[str, Optional[Any]]:
-        keys: List[str] = await self.redis.keys(f"{prefix}*")
-        values: Dict[str, Optional[Any]] = {}
-        for key in keys:
-            serialized_obj = await self.redis.get(key)
-            if serialized_obj:
-                obj = pickle.loads(serialized_obj)
-                values[key] = obj
-            else:
-                values[key] = None
-        return values
+        return {
+            key: obj async for key, obj in self.iter_obj_by_prefix(prefix)
+        }
 
     async def remove_by_key(self, key: str) -> int:
         return await self.redis.delete(key)
 
+    async def publish(self, channel: str, message: str) -> int:
+        return await self.redis.publish(channel, message)
+
+    async def listen(self, channel: str) -> AsyncIterator[bytes]:
+        """
+        Polls with get_message(timeout=...), so an idle channel is "no
+        message" rather than a read timeout of the pooled connection
+        """
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
+        try:
+            while True:
+                try:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=self.PUBSUB_POLL_TIMEOUT,
+                    )
+                except RedisTimeoutError:
+                    continue
+                if message is not None:
+                    yield message["data"]
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+
     async def disconnect(self):
-        self.redis.close()
-        await self.redis.wait_closed()
+        await self.redis.aclose()
+        await self.redis.connection_pool.disconnect()
 
     async def clean_all(self):
-        keys = await self.redis.keys("*")
-        for key in keys:
-            await self.redis.delete(key)
\ No newline at end of file
+        async for keys in self.iter_keys_by_prefix(""):
+            await self.redis.unlink(*keys)
\ No newline at end of file
@@ -0,0 +1,165 @@
+import pickle
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Type
+
+import msgpack
+import orjson
+from pydantic import BaseModel, ValidationError
+
+from src.app.schemas.auth import AuthTokenORMSchema, Token, User
+
+
+class RedisCodec(ABC):
+    codec_id: int
+
+    @abstractmethod
+    def dumps(self, data: Any) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def loads(self, payload: bytes) -> Any:
+        raise NotImplementedError
+
+
+class OrjsonCodec(RedisCodec):
+    codec_id = 1
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data)
+
+    def loads(self, payload: bytes) -> Any:
+        return orjson.loads(payload)
+
+
+class MsgpackCodec(RedisCodec):
+    codec_id = 2
+
+    def dumps(self, data: Any) -> bytes:
+        return msgpack.packb(data, use_bin_type=True, default=str)
+
+    def loads(self, payload: bytes) -> Any:
+        return msgpack.unpackb(payload, raw=False)
+
+
+class PickleCodec(RedisCodec):
+    codec_id = 3
+
+    def dumps(self, data: Any) -> bytes:
+        return pickle.dumps(data)
+
+    def loads(self, payload: bytes) -> Any:
+        return pickle.loads(payload)
+
+
+# a value written by another deploy or corrupted in transit is a miss
+DECODE_ERRORS = (
+    ValidationError,
+    orjson.JSONDecodeError,
+    msgpack.UnpackException,
+    ValueError,
+    TypeError,
+    KeyError,
+    zlib.error,
+    pickle.UnpicklingError,
+    AttributeError,
+    EOFError,
+    ImportError,
+)
+
+
+CODECS: Dict[str, RedisCodec] = {
+    "orjson": OrjsonCodec(),
+    "msgpack": MsgpackCodec(),
+    "pickle": PickleCodec(),
+}
+
+
+class RedisSerializer:
+    """
+    Value layout: [format version][codec id][flags] + payload.
+    Pydantic models are stored in their dumped form tagged with the class
+    name, so reads survive a change of the class layout during deploys.
+    Pickled values, legacy or codec 3, are read only with legacy_pickle
+    (or the pickle codec itself): unpickling runs whatever anyone with
+    write access to Redis put there
+    """
+
+    FORMAT_VERSION = 1
+    FLAG_COMPRESSED = 0x01
+    PICKLE_PROTO_MARKER = 0x80
+
+    def __init__(
+        self,
+        codec: str = "orjson",
+        compress_threshold: int = 0,
+        legacy_pickle: bool = False,
+    ):
+        self._codec = CODECS[codec]
+        self._compress_threshold = compress_threshold
+        self._reads_pickle = legacy_pickle or codec == "pickle"
+        self._models: Dict[str, Type[BaseModel]] = {}
+
+    def register_model(self, model: Type[BaseModel]) -> None:
+        self._models[model.__name__] = model
+
+    def dumps(self, obj: Any) -> bytes:
+        if isinstance(obj, BaseModel):
+            obj = {
+                "__model__": type(obj).__name__,
+                "data": obj.model_dump(mode="json"),
+            }
+        payload = self._codec.dumps(obj)
+
+        flags = 0
+        if self._compress_threshold and len(payload) > self._compress_threshold:
+            payload = zlib.compress(payload, 1)
+            flags |= self.FLAG_COMPRESSED
+        return bytes((self.FORMAT_VERSION, self._codec.codec_id, flags)) + payload
+
+    def loads(self, value: bytes) -> Optional[Any]:
+        """
+        None for values this version can't read, callers treat it as a miss
+        """
+        try:
+            return self._loads(value)
+        except DECODE_ERRORS:
+            return None
+
+    def _loads(self, value: bytes) -> Optional[Any]:
+        if not value:
+            return None
+        if value[0] == self.PICKLE_PROTO_MARKER:  # written before codecs
+            return pickle.loads(value) if self._reads_pickle else None
+        if value[0] != self.FORMAT_VERSION or len(value) < 3:
+            return None
+
+        codec_id, flags = value[1], value[2]
+        payload = value[3:]
+        if flags & self.FLAG_COMPRESSED:
+            payload = zlib.decompress(payload)
+        codec = next(
+            (c for c in CODECS.values() if c.codec_id == codec_id), None
+        )
+        if codec is None:
+            return None
+        if codec.codec_id == PickleCodec.codec_id and not self._reads_pickle:
+            return None
+
+        obj = codec.loads(payload)
+        if isinstance(obj, dict) and "__model__" in obj:
+            model = self._models.get(obj["__model__"])
+            if model is None:
+                return None
+            return model.model_validate(obj["data"])
+        return obj
+
+
+def build_serializer(
+    codec: str, compress_threshold: int, legacy_pickle: bool = False
+) -> RedisSerializer:
+    serializer = RedisSerializer(codec, compress_threshold, legacy_pickle)
+    serializer.register_model(User)
+    serializer.register_model(AuthTokenORMSchema)
+    serializer.register_model(Token)
+    return serializer
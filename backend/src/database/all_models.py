@@ -1,10 +1,14 @@
 
 from ..app.models.users.auth_auth import UserORM
-from ..app.models.users.auth_token import AuthTokenORM
+from ..app.models.users.auth_token import (
+    AuthTokenORM,
+    RotatedRefreshTokenORM,
+)
 from ..app.models.users.client import ClientORM
 
 __all__ = [
     "ClientORM",
     "UserORM",
     "AuthTokenORM",
+    "RotatedRefreshTokenORM",
 ]
\ No newline at end of file
@@ -3,11 +3,16 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.app_config.config_db import db_settings
+from src.app.utils.metrics import metrics
 from .db_accessor import DatabaseAccessor
 
-database_accessor = DatabaseAccessor(db_settings=db_settings)
+database_accessor = DatabaseAccessor(
+    db_settings=db_settings,
+    statement_cache_size=db_settings.DB_STATEMENT_CACHE_SIZE,
+)
 
 database_accessor.new_run()
+metrics.register("db_pool", database_accessor.pool_stats)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -1,15 +1,85 @@
-from collections import OrderedDict
+import asyncio
+import random
+import time
+import uuid
+from collections import OrderedDict, deque
 from contextlib import asynccontextmanager
 from re import compile
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from src.app_config.app_settings import app_settings
 from src.app_config.config_db import DBSettings
 
 
+CHECKED_OUT_AT_KEY = "timed_pool_checked_out_at"
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts wait for a connection and
+    how long they hold it
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.returns = 0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        # on the record itself, it lives exactly as long as the connection
+        record.info[CHECKED_OUT_AT_KEY] = time.perf_counter()
+        return record
+
+    def _do_return_conn(self, record):
+        started = record.info.pop(CHECKED_OUT_AT_KEY, None)
+        if started is not None:
+            held = time.perf_counter() - started
+            self.returns += 1
+            self.hold_total += held
+            self.hold_max = max(self.hold_max, held)
+        super()._do_return_conn(record)
+
+
+class Stopwatch:
+    """
+    Rolling window of health check latencies of one host
+    """
+
+    def __init__(self, window_size: int):
+        self._samples: deque[float] = deque(maxlen=window_size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    @property
+    def average(self) -> float | None:
+        if not self._samples:
+            return None
+        return sum(self._samples) / len(self._samples)
+
+
 # class DatabaseAccessor(Singleton):
 class DatabaseAccessor:
     _db_settings = None
@@ -28,6 +98,10 @@ class DatabaseAccessor:
         self._session_makers = OrderedDict()
         self._statement_cache_size = statement_cache_size
         self._async_session_maker = None
+        self.engine = None
+        self._replica_engines: Dict[str, AsyncEngine] = {}
+        self._stopwatches: Dict[str, Stopwatch] = {}
+        self._refresh_task: asyncio.Task | None = None
 
     def set_settings(
         self, db_settings: DBSettings, statement_cache_size: int = 0
@@ -42,47 +116,163 @@ class DatabaseAccessor:
         self._async_session_maker = None
 
     async def run(self) -> None:
-        await self._set_engine()
+        self.new_run()
+        if self._replica_engines and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_replicas())
+
+    def new_run(self) -> None:
+        """One pooled engine per worker process, later calls reuse it"""
+        if self.engine is None:
+            self._set_engine_sync()
 
-    async def _set_engine(self) -> None:
+    def _pool_sizing(self) -> tuple[int, int]:
+        """
+        DB_POOL_SIZE and DB_MAX_OVERFLOW are budgets for the whole
+        instance, every uvicorn worker gets its share
+        """
+        workers = max(1, app_settings.WORKERS)
+        pool_size = max(1, self._db_settings.DB_POOL_SIZE // workers)
+        max_overflow = max(0, self._db_settings.DB_MAX_OVERFLOW // workers)
+        return pool_size, max_overflow
+
+    def _set_engine_sync(self) -> None:
         if "sqlite" in self._dsn:
             self.engine = create_async_engine(
                 self._dsn,
                 connect_args={"check_same_thread": False},  # Важно для SQLite
                 echo=False,
             )
-        else:
-            self.engine = create_async_engine(
-                self._dsn,
-                pool_size=self._db_settings.DB_POOL_SIZE,
-                max_overflow=self._db_settings.DB_MAX_OVERFLOW,
-                future=True,
-                echo=False,
+            return
+
+        self.engine = self._create_engine(self._dsn)
+        self._stopwatches[self._db_settings.HOST] = Stopwatch(
+            self.DEFAULT_STOPWATCH_WINDOW_SIZE
+        )
+        for host in self._db_settings.REPLICA_HOSTS:
+            self._replica_engines[host] = self._create_engine(
+                self._db_settings.replica_dsn_async(host)
+            )
+            self._stopwatches[host] = Stopwatch(
+                self.DEFAULT_STOPWATCH_WINDOW_SIZE
             )
 
-    def new_run(self) -> None:
-        self._set_engine_sync()
+    def _create_engine(self, dsn: str) -> AsyncEngine:
+        pool_size, max_overflow = self._pool_sizing()
+        pool_timeout = self._db_settings.DB_POOL_TIMEOUT
+        if pool_timeout is None:
+            pool_timeout = self.DEFAULT_ACQUIRE_TIMEOUT
 
-    def _set_engine_sync(self) -> None:
-        self.engine = create_async_engine(
-            self._dsn,
+        return create_async_engine(
+            dsn,
+            connect_args=self._connect_args(),
+            poolclass=TimedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=self._db_settings.DB_POOL_RECYCLE,
             pool_pre_ping=True,
-            # pool_size=self._db_settings.DB_POOL_SIZE,
-            # max_overflow=self._db_settings.DB_MAX_OVERFLOW,
-            poolclass=NullPool,
             future=True,
             echo=False,
         )
 
+    def _connect_args(self) -> Dict[str, Any]:
+        """
+        direct: asyncpg and SQLAlchemy keep prepared statements per
+        connection. pgbouncer (transaction mode): server connections are
+        shared, so nothing may be cached and statement names must be unique
+        """
+        if self._db_settings.DB_CONNECTION_MODE == "pgbouncer":
+            return {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": (
+                    lambda: f"__asyncpg_{uuid.uuid4()}__"
+                ),
+            }
+        return {
+            "statement_cache_size": self._statement_cache_size,
+            "prepared_statement_cache_size": self._statement_cache_size,
+        }
+
+    async def _check_host(self, host: str, engine: AsyncEngine) -> bool:
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.DEFAULT_REFRESH_TIMEOUT):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except Exception:
+            return False
+        self._stopwatches[host].add(time.perf_counter() - started)
+        return True
+
+    async def _refresh_replicas(self) -> None:
+        """
+        Drops replicas that fail the health check from the read rotation
+        and brings them back once they answer again
+        """
+        while True:
+            await self._check_host(self._db_settings.HOST, self.engine)
+            for host, engine in self._replica_engines.items():
+                if await self._check_host(host, engine):
+                    if host not in self._session_makers:
+                        self._session_makers[host] = sessionmaker(
+                            bind=engine,
+                            expire_on_commit=False,
+                            class_=AsyncSession,
+                        )
+                else:
+                    self._session_makers.pop(host, None)
+            await asyncio.sleep(self.DEFAULT_REFRESH_DELAY)
+
+    def _host_weight(self, host: str) -> float:
+        latency = self._stopwatches[host].average
+        return 1 / latency if latency else 1.0
+
+    def pool_stats(self) -> Dict[str, Any]:
+        pool = self.engine.pool if self.engine is not None else None
+        if not isinstance(pool, TimedQueuePool):
+            return {}
+        stats = self._engine_pool_stats(pool)
+        if self._replica_engines:
+            stats["replicas"] = {
+                host: {
+                    **self._engine_pool_stats(engine.pool),
+                    "healthy": host in self._session_makers,
+                    "latency_avg_seconds": self._stopwatches[host].average,
+                }
+                for host, engine in self._replica_engines.items()
+            }
+        return stats
+
+    @staticmethod
+    def _engine_pool_stats(pool: TimedQueuePool) -> Dict[str, Any]:
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            "overflow": max(0, pool.overflow()),
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "wait_avg_seconds": (
+                pool.wait_total / pool.checkouts if pool.checkouts else 0.0
+            ),
+            "wait_max_seconds": pool.wait_max,
+            "hold_avg_seconds": (
+                pool.hold_total / pool.returns if pool.returns else 0.0
+            ),
+            "hold_max_seconds": pool.hold_max,
+        }
+
     async def init_db(self, Base) -> None:
         """use it if u not use alembic"""
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
     def _create_session(self) -> None:
-        self._async_session_maker = sessionmaker(
-            bind=self.engine, expire_on_commit=False, class_=AsyncSession
-        )
+        if self._async_session_maker is None:
+            self._async_session_maker = sessionmaker(
+                bind=self.engine, expire_on_commit=False, class_=AsyncSession
+            )
 
     def get_sync_session(self):
         return scoped_session(
@@ -93,9 +283,30 @@ class DatabaseAccessor:
         )
 
     def get_async_session_maker(self) -> sessionmaker:
-        return sessionmaker(
-            bind=self.engine, expire_on_commit=False, class_=AsyncSession
+        self._create_session()
+        return self._async_session_maker
+
+    def get_read_session_maker(self) -> sessionmaker:
+        """
+        Picks a healthy replica weighted by inverse average latency,
+        the master takes part with DEFAULT_MASTER_AS_REPLICA_WEIGHT
+        """
+        if not self._session_makers:
+            return self.get_async_session_maker()
+
+        hosts = list(self._session_makers)
+        weights = [self._host_weight(host) for host in hosts]
+        master_weight = self.DEFAULT_MASTER_AS_REPLICA_WEIGHT * (
+            self._host_weight(self._db_settings.HOST)
         )
+        if master_weight > 0:
+            hosts.append(None)
+            weights.append(master_weight)
+
+        host = random.choices(hosts, weights=weights)[0]
+        if host is None:
+            return self.get_async_session_maker()
+        return self._session_makers[host]
 
     @asynccontextmanager
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
@@ -104,4 +315,10 @@ class DatabaseAccessor:
             yield session
 
     async def stop(self) -> None:
-        await self.engine.dispose()
\ No newline at end of file
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        for engine in self._replica_engines.values():
+            await engine.dispose()
+        if self.engine is not None:
+            await self.engine.dispose()
\ No newline at end of file
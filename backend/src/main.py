@@ -1,8 +1,7 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from starlette import status
 
@@ -10,14 +9,32 @@ from .app.api.router import router as api_router
 from src.app_config.app_settings import app_settings
 from src.database.database import database_accessor
 from src.admin import create_admin
-from src.app_config.config_redis import RedisRepository
-from .redisrepo.dependencies import get_redis_repo
+from src.app.utils.static.password_pool import password_pool
+from src.app.utils.user_cache import user_cache
+from src.app.utils.refresh_grace import refresh_grace
+from src.app.utils.login_limiter import login_limiter
+from src.app.services.session_reaper import session_reaper
+from src.app.utils.response_cache import (
+    init_response_cache,
+    rebind_response_cache,
+)
+from .redisrepo.dependencies import redis_manager
 
 
 def bind_exceptions(app: FastAPI) -> None:
+    @app.exception_handler(PoolTimeoutError)
+    async def pool_timeout_error(
+        _: Request, exc: Exception
+    ) -> ORJSONResponse:
+        return ORJSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"message": "Database is busy, try again later"},
+            headers={"Retry-After": "1"},
+        )
+
     @app.exception_handler(Exception)
-    async def unhandled_error(_: Request, exc: Exception) -> JSONResponse:
-        return JSONResponse(
+    async def unhandled_error(_: Request, exc: Exception) -> ORJSONResponse:
+        return ORJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={"message": str(exc)},
         )
@@ -26,16 +43,30 @@ def bind_exceptions(app: FastAPI) -> None:
 def bind_events(app: FastAPI) -> None:
     @app.on_event("startup")
     async def set_engine():
+        password_pool.start()
         db = database_accessor
         await db.run()
         app.state.db = db
-        get_redis_repo.redis_repo = await RedisRepository.connect()
+        redis_repo = await redis_manager.start()
+        await user_cache.start(redis_repo)
+        await refresh_grace.start(redis_repo)
+        await login_limiter.start(redis_repo)
+        init_response_cache(redis_repo)
+        redis_manager.on_reconnect(rebind_response_cache)
+        if app_settings.SESSION_STORE_BACKEND == "sql":
+            session_reaper.start()
 
         create_admin(app, database_accessor.engine)
 
     @app.on_event("shutdown")
     async def close_engine():
+        await session_reaper.stop()
+        await user_cache.stop()
+        await refresh_grace.stop()
+        await login_limiter.stop()
+        await redis_manager.stop()
         await app.state.db.stop()
+        password_pool.stop()
 
 
 def get_app() -> FastAPI:
@@ -45,6 +76,7 @@ def get_app() -> FastAPI:
         description="KOKOS API",
         docs_url="/docs",
         openapi_url="/api/test",
+        default_response_class=ORJSONResponse,
     )
 
     bind_events(app)
@@ -57,6 +89,7 @@ def get_app() -> FastAPI:
         allow_credentials=True,
         allow_methods="*",
         allow_headers="*",
+        expose_headers=["X-Next-Cursor", "X-Total-Count"],
     )
     return app
 
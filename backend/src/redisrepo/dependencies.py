@@ -1,5 +1,99 @@
-from src.app_config.config_redis import RedisRepository
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from src.app_config.config_redis import RedisRepository, RedisSettings
+from src.app.utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class RedisManager:
+    """
+    One pooled Redis client per worker, created at startup. A background
+    task pings it and rebuilds the pool with exponential backoff when the
+    server stops answering
+    """
+
+    def __init__(self) -> None:
+        self.repo: Optional[RedisRepository] = None
+        self.healthy = False
+        self.reconnects = 0
+        self._settings: Optional[RedisSettings] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._reconnect_hooks: List[Callable[[RedisRepository], None]] = []
+
+    def on_reconnect(self, hook: Callable[[RedisRepository], None]) -> None:
+        """For holders of the raw client rather than the repository"""
+        self._reconnect_hooks.append(hook)
+
+    async def start(self) -> RedisRepository:
+        self._settings = RedisSettings()
+        self.repo = RedisRepository.create(self._settings)
+        await self._check()
+        if not self.healthy:
+            logger.warning("Redis is unavailable, will keep reconnecting")
+        self._health_task = asyncio.create_task(self._health_loop())
+        return self.repo
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        if self.repo is not None:
+            await self.repo.disconnect()
+
+    async def _check(self) -> None:
+        try:
+            self.healthy = bool(await self.repo.ping())
+        except RedisError:
+            self.healthy = False
+
+    async def _health_loop(self) -> None:
+        backoff = 0.5
+        while True:
+            if self.healthy:
+                backoff = 0.5
+                await asyncio.sleep(self._settings.health_check_interval)
+            else:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self._settings.reconnect_backoff_max)
+                await self._reconnect()
+            await self._check()
+
+    async def _reconnect(self) -> None:
+        """
+        Swaps the client in place, everyone holding the repository picks
+        up the new pool
+        """
+        fresh = RedisRepository.create(self._settings)
+        stale = self.repo.redis
+        self.repo.redis = fresh.redis
+        self.reconnects += 1
+        for hook in self._reconnect_hooks:
+            hook(self.repo)
+        try:
+            await stale.aclose()
+            await stale.connection_pool.disconnect()
+        except RedisError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        if self.repo is None:
+            return {}
+        return {
+            **self.repo.pool_stats(),
+            "healthy": self.healthy,
+            "reconnects": self.reconnects,
+        }
+
+
+redis_manager = RedisManager()
+metrics.register("redis_pool", redis_manager.stats)
 
 
 async def get_redis_repo() -> RedisRepository:
-    return await RedisRepository.connect()
\ No newline at end of file
+    return redis_manager.repo
@@ -0,0 +1,57 @@
+import os
+
+import fakeredis
+import httpx
+import pytest
+
+
+# Settings are read at import time, so they have to be in place before
+# anything from src is imported. Nothing connects until startup
+os.environ.update(
+    {
+        "DB__HOST": "localhost",
+        "DB__PORT": "5432",
+        "DB__NAME": "test",
+        "DB__USER": "test",
+        "DB__PASS": "test",
+        "DB__DB_POOL_SIZE": "1",
+        "DB__DB_MAX_OVERFLOW": "0",
+        "DB__DB_URL": "test",
+        "BACKEND_SERVER__PORT": "8080",
+        "BACKEND_SERVER__HOST": "localhost",
+        "BACKEND_SERVER__WORKERS": "1",
+        "BACKEND_SERVER__SECRET_KEY": "test",
+        "BACKEND_SERVER__SAVE_PATH": "test",
+        "BACKEND_SERVER__METHODS": '["GET"]',
+        "BACKEND_SERVER__HEADERS": '["*"]',
+        "BACKEND_SERVER__ALGORITHM": "HS256",
+        "BACKEND_SERVER__REFRESH_TOKEN_EXPIRE_DAYS": "30",
+        "BACKEND_SERVER__ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+        "REDIS_ENDPOINT": "redis://localhost:6379",
+    }
+)
+
+from src.app_config.config_redis import RedisRepository  # noqa: E402
+from src.main import app  # noqa: E402
+
+
+@pytest.fixture
+async def redis_repo():
+    """In-memory Redis with Lua, scripts run as they would on the server"""
+    redis = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+    yield RedisRepository(redis)
+    await redis.aclose()
+
+
+@pytest.fixture
+async def client():
+    """
+    Talks to the app in-process. Startup doesn't run, tests override the
+    dependencies they need
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="https://test"
+    ) as client:
+        yield client
+    app.dependency_overrides.clear()
@@ -0,0 +1,55 @@
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.app.schemas.types import UserRole
+from src.app.utils.static.auth_crypto import AuthContext, TokenUtils
+
+
+def _request(cookie: str | None) -> Request:
+    headers = []
+    if cookie is not None:
+        headers.append((b"cookie", f"access_token={cookie}".encode()))
+    return Request({"type": "http", "headers": headers, "state": {}})
+
+
+@pytest.fixture
+def decode(monkeypatch) -> MagicMock:
+    decode = MagicMock(wraps=TokenUtils.decode_access_token)
+    monkeypatch.setattr(TokenUtils, "decode_access_token", decode)
+    return decode
+
+
+async def test_one_decode_per_request(decode):
+    token = TokenUtils.create_access_token(
+        uuid.uuid4(), UserRole.ClientRole, True
+    )
+    request = _request(f"Bearer {token}")
+
+    first = await AuthContext.from_request(request)
+    again = await AuthContext.from_request(request)
+    admin = AuthContext.from_token(request, f"Bearer {token}")
+
+    assert first is again is admin
+    assert decode.call_count == 1
+
+
+async def test_failed_decode_is_not_retried(decode):
+    request = _request("Bearer not-a-jwt")
+
+    for _ in range(3):
+        with pytest.raises(HTTPException):
+            await AuthContext.from_request(request)
+
+    assert decode.call_count == 1
+
+
+async def test_missing_cookie_never_decodes(decode):
+    with pytest.raises(HTTPException) as exc:
+        await AuthContext.from_request(_request(None))
+
+    assert exc.value.status_code == 401
+    assert decode.call_count == 0
@@ -0,0 +1,100 @@
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from src.app.repositories.metauser.auth_token import AuthTokenRepository
+from src.app.schemas.auth import RefreshSessionCreate
+from src.app.schemas.types import UserRole
+
+
+USER_ID = uuid.uuid4()
+FAMILY_ID = uuid.uuid4()
+
+
+def _session(row: dict | None = None) -> MagicMock:
+    result = MagicMock()
+    result.mappings.return_value.one_or_none.return_value = row
+    result.mappings.return_value.__iter__.return_value = iter(())
+    result.rowcount = 0
+    session = MagicMock()
+    session.info = {}
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+def _compiled(session: MagicMock, call: int = -1):
+    (stmt,), _ = session.execute.call_args_list[call]
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+async def test_login_starts_a_family():
+    session = _session()
+    token = RefreshSessionCreate(
+        refresh_token=uuid.uuid4(), expires_in=3600, user_id=USER_ID
+    )
+
+    await AuthTokenRepository(session).add_token(token)
+
+    assert _compiled(session).params["family_id"] == token.family_id
+
+
+async def test_rotation_keeps_the_family_and_records_the_old_token():
+    old, new = uuid.uuid4(), uuid.uuid4()
+    session = _session(
+        {
+            "id": 1,
+            "user_id": USER_ID,
+            "family_id": FAMILY_ID,
+            "role": UserRole.ClientRole,
+            "is_active": True,
+        }
+    )
+
+    rotation = await AuthTokenRepository(session).rotate_token(
+        str(old), new, 3600
+    )
+
+    assert rotation.user_id == USER_ID
+    assert session.execute.await_count == 2
+    update = _compiled(session, 0)
+    assert "family_id" not in str(update).split("RETURNING")[0]
+    assert new in update.params.values()
+    history = _compiled(session, 1)
+    assert "INSERT INTO auth_refresh_rotated" in str(history)
+    assert history.params["refresh_token"] == str(old)
+    assert history.params["family_id"] == FAMILY_ID
+
+
+async def test_failed_rotation_records_nothing():
+    session = _session(None)
+
+    rotation = await AuthTokenRepository(session).rotate_token(
+        str(uuid.uuid4()), uuid.uuid4(), 3600
+    )
+
+    assert rotation is None
+    assert session.execute.await_count == 1
+
+
+async def test_reuse_revokes_by_family():
+    reused = str(uuid.uuid4())
+    session = _session()
+
+    await AuthTokenRepository(session).revoke_token_family(reused)
+
+    stmt = _compiled(session)
+    sql = str(stmt)
+    assert sql.startswith("DELETE FROM auth_refresh_session")
+    assert "auth_refresh_session.family_id = (SELECT" in sql
+    assert "FROM auth_refresh_rotated" in sql
+    assert list(stmt.params.values()).count(reused) == 2
+
+
+async def test_reaper_clears_expired_rotated_tokens():
+    session = _session()
+
+    await AuthTokenRepository(session).delete_expired_batch(100)
+
+    tables = [str(_compiled(session, i)).split()[2] for i in (0, 1)]
+    assert tables == ["auth_refresh_session", "auth_refresh_rotated"]
@@ -0,0 +1,23 @@
+import pytest
+
+from src.app_config.config_redis import escape_glob
+
+
+def test_escape_glob():
+    assert escape_glob(r"a*b?c[d]e\f") == r"a\*b\?c\[d\]e\\f"
+    assert escape_glob("user_cache:v2:") == "user_cache:v2:"
+
+
+@pytest.mark.parametrize("prefix", ["a*", "a?", "a[b]", "a\\"])
+async def test_prefix_is_matched_literally(redis_repo, prefix):
+    await redis_repo.redis.set(f"{prefix}:1", 1)
+    # matched by the unescaped glob, not by the literal prefix
+    await redis_repo.redis.set("ab:1", 1)
+
+    keys = [
+        key
+        async for page in redis_repo.iter_keys_by_prefix(prefix)
+        for key in page
+    ]
+
+    assert keys == [f"{prefix}:1".encode()]
@@ -0,0 +1,148 @@
+import pytest
+
+from src.app.repositories.exceptions import TooManyLoginAttemptsException
+from src.app.utils import login_limiter as login_limiter_module
+from src.app.utils.login_limiter import LoginRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(login_limiter_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+async def limiter(redis_repo, clock) -> LoginRateLimiter:
+    limiter = LoginRateLimiter(
+        per_login=2, per_ip=3, window=60, local_size=100
+    )
+    await limiter.start(redis_repo)
+    return limiter
+
+
+async def _attempts(redis_repo, limiter, login, client_ip=None) -> dict:
+    keys = limiter._keys(login, client_ip)
+    return {key: await redis_repo.redis.zcard(key) for key in keys}
+
+
+async def test_login_over_its_limit_is_rejected(limiter):
+    await limiter.check("alice", "10.0.0.1")
+    await limiter.check("alice", "10.0.0.1")
+    with pytest.raises(TooManyLoginAttemptsException) as exc:
+        await limiter.check("alice", "10.0.0.1")
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "60"
+    assert limiter.rejected == 1
+
+
+async def test_rejected_attempt_is_not_recorded(redis_repo, limiter):
+    await limiter.check("alice", "10.0.0.1")
+    await limiter.check("alice", "10.0.0.1")
+    limiter._local_size = 0
+    for _ in range(3):
+        with pytest.raises(TooManyLoginAttemptsException):
+            await limiter.check("alice", "10.0.0.1")
+
+    attempts = await _attempts(redis_repo, limiter, "alice", "10.0.0.1")
+    assert sorted(attempts.values()) == [2, 2]
+
+
+async def test_only_the_key_over_its_limit_is_blocked(limiter):
+    await limiter.check("alice", "10.0.0.1")
+    await limiter.check("alice", "10.0.0.1")
+    with pytest.raises(TooManyLoginAttemptsException):
+        await limiter.check("alice", "10.0.0.1")
+
+    # same IP, other login: the IP is under its limit of 3
+    await limiter.check("bob", "10.0.0.1")
+    assert limiter.rejected_locally == 0
+    assert list(limiter._blocked) == list(limiter._keys("alice", None))
+
+
+async def test_ip_limit_spans_logins(limiter):
+    for login in ("alice", "bob", "carol"):
+        await limiter.check(login, "10.0.0.1")
+    with pytest.raises(TooManyLoginAttemptsException):
+        await limiter.check("dave", "10.0.0.1")
+    await limiter.check("dave", "10.0.0.2")
+
+
+async def test_window_slides(limiter, clock):
+    await limiter.check("alice", None)
+    clock.now += 30
+    await limiter.check("alice", None)
+    with pytest.raises(TooManyLoginAttemptsException) as exc:
+        await limiter.check("alice", None)
+    # the first attempt leaves the window 30s from now
+    assert exc.value.headers["Retry-After"] == "30"
+
+    clock.now += 30
+    await limiter.check("alice", None)
+
+
+async def test_local_block_skips_redis(redis_repo, limiter):
+    await limiter.check("alice", None)
+    await limiter.check("alice", None)
+    with pytest.raises(TooManyLoginAttemptsException):
+        await limiter.check("alice", None)
+
+    await redis_repo.redis.flushall()
+    with pytest.raises(TooManyLoginAttemptsException):
+        await limiter.check("alice", None)
+    assert limiter.rejected_locally == 1
+
+
+async def test_passes_without_redis(clock):
+    limiter = LoginRateLimiter(
+        per_login=2, per_ip=3, window=60, local_size=100
+    )
+    for _ in range(5):
+        await limiter.check("alice", None)
+    assert limiter.rejected == 0
+
+
+async def test_login_spellings_share_a_window(limiter):
+    await limiter.check("Alice", None)
+    await limiter.check(" alice ", None)
+    with pytest.raises(TooManyLoginAttemptsException):
+        await limiter.check("ALICE", None)
+
+
+async def test_successful_attempts_are_forgiven(redis_repo, limiter):
+    for _ in range(5):
+        attempt = await limiter.check("alice", "10.0.0.1")
+        await limiter.forgive("alice", "10.0.0.1", attempt)
+
+    attempts = await _attempts(redis_repo, limiter, "alice", "10.0.0.1")
+    assert sorted(attempts.values()) == [0, 0]
+    assert limiter.forgiven == 5
+
+
+async def test_failures_still_count_after_a_success(limiter):
+    attempt = await limiter.check("alice", None)
+    await limiter.forgive("alice", None, attempt)
+    await limiter.check("alice", None)
+    await limiter.check("alice", None)
+    with pytest.raises(TooManyLoginAttemptsException):
+        await limiter.check("alice", None)
+
+
+async def test_nothing_to_forgive_without_redis(clock):
+    limiter = LoginRateLimiter(
+        per_login=2, per_ip=3, window=60, local_size=100
+    )
+    assert await limiter.check("alice", None) is None
+    await limiter.forgive("alice", None, None)
+    assert limiter.forgiven == 0
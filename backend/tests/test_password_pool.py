@@ -0,0 +1,36 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.app.repositories.exceptions import PasswordPoolBusyException
+from src.app.utils.static.password_pool import PasswordPool
+
+
+@pytest.fixture
+def pool():
+    pool = PasswordPool(workers=1, max_queue=1)
+    # threads instead of spawned processes, the queue logic is the same
+    pool._executor = ThreadPoolExecutor(max_workers=1)
+    yield pool
+    pool.stop()
+
+
+async def test_full_queue_fails_fast(pool):
+    release = threading.Event()
+    running = [
+        asyncio.create_task(pool.run(release.wait, 5)) for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    assert pool.pending == 2
+
+    with pytest.raises(PasswordPoolBusyException) as exc:
+        await pool.run(release.wait, 5)
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+
+    release.set()
+    assert await asyncio.gather(*running) == [True, True]
+    assert pool.pending == 0
+    assert await pool.run(len, "ok") == 2
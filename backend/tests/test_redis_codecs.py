@@ -0,0 +1,37 @@
+import pickle
+import uuid
+
+import pytest
+
+from src.app.schemas.auth import User
+from src.app.schemas.types import UserRole
+from src.app_config.redis_codecs import build_serializer
+
+
+USER = User(
+    id=uuid.uuid4(), login="alice", role=UserRole.ClientRole, is_active=True
+)
+
+
+@pytest.mark.parametrize("codec", ["orjson", "msgpack"])
+@pytest.mark.parametrize("compress_threshold", [0, 1])
+def test_round_trip(codec, compress_threshold):
+    serializer = build_serializer(codec, compress_threshold)
+    assert serializer.loads(serializer.dumps(USER)) == USER
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        pickle.dumps(USER),  # written before the codecs
+        build_serializer("pickle", 0).dumps(USER),
+    ],
+)
+def test_pickle_is_a_miss_by_default(value):
+    assert build_serializer("orjson", 0).loads(value) is None
+    assert build_serializer("orjson", 0, legacy_pickle=True).loads(value)
+
+
+def test_undecodable_value_is_a_miss():
+    serializer = build_serializer("orjson", 0)
+    assert serializer.loads(b"\x01\x01\x00{not json") is None
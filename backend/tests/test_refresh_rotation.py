@@ -0,0 +1,263 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import RedisError
+
+from src.app.repositories.exceptions import (
+    UnsupportedSessionFilterException,
+)
+from src.app.repositories.metauser.auth_token_redis import (
+    USER_SESSIONS_KEY,
+    RedisAuthTokenRepository,
+)
+from src.app.schemas.auth import RefreshSessionCreate
+from src.app.schemas.types import UserRole
+from src.app.services import user as user_service
+from src.app.utils.refresh_grace import RefreshGrace
+from src.app.utils.unitofwork import get_uow
+from src.main import app
+
+
+REFRESH_URL = "/api/auth/refresh"
+USER_ID = uuid.uuid4()
+
+
+class FakeUnitOfWork:
+    """Only the session store, which the Redis backend writes directly"""
+
+    def __init__(self, token: RedisAuthTokenRepository):
+        self.token = token
+
+    async def __aenter__(self) -> "FakeUnitOfWork":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    async def commit(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+
+@pytest.fixture
+def sessions(redis_repo) -> RedisAuthTokenRepository:
+    users = MagicMock()
+    users.find_one_or_none_user = AsyncMock(
+        return_value=SimpleNamespace(
+            id=USER_ID, role=UserRole.ClientRole, is_active=True
+        )
+    )
+    return RedisAuthTokenRepository(redis_repo, users)
+
+
+@pytest.fixture
+async def grace(redis_repo, monkeypatch) -> RefreshGrace:
+    grace = RefreshGrace(window=0.5, rotation_timeout=1)
+    await grace.start(redis_repo)
+    monkeypatch.setattr(user_service, "refresh_grace", grace)
+    return grace
+
+
+@pytest.fixture
+def uow(client, sessions, grace) -> None:
+    app.dependency_overrides[get_uow] = lambda: FakeUnitOfWork(sessions)
+
+
+async def _login(sessions: RedisAuthTokenRepository) -> str:
+    refresh_token = uuid.uuid4()
+    await sessions.add_token(
+        RefreshSessionCreate(
+            refresh_token=refresh_token, expires_in=3600, user_id=USER_ID
+        )
+    )
+    return str(refresh_token)
+
+
+async def _refresh(client, refresh_token: str):
+    return await client.post(
+        REFRESH_URL, headers={"Cookie": f"refresh_token={refresh_token}"}
+    )
+
+
+async def _user_tokens(redis_repo) -> set[str]:
+    members = await redis_repo.redis.smembers(f"{USER_SESSIONS_KEY}{USER_ID}")
+    return {m.decode() for m in members}
+
+
+async def test_concurrent_refreshes_share_one_rotation(
+    client, uow, sessions, redis_repo
+):
+    old = await _login(sessions)
+
+    responses = await asyncio.gather(
+        *(_refresh(client, old) for _ in range(5))
+    )
+
+    assert [r.status_code for r in responses] == [200] * 5
+    new_tokens = {r.json()["refresh_token"] for r in responses}
+    assert len(new_tokens) == 1
+    assert await _user_tokens(redis_repo) == new_tokens
+    assert await sessions.find_one_or_none_token(refresh_token=old) is None
+
+
+async def test_retry_within_grace_window_gets_the_same_pair(
+    client, uow, sessions
+):
+    old = await _login(sessions)
+    first = await _refresh(client, old)
+    retry = await _refresh(client, old)
+
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+
+
+async def test_reuse_after_grace_window_revokes_the_session(
+    client, uow, sessions, grace, redis_repo
+):
+    old = await _login(sessions)
+    rotated = await _refresh(client, old)
+    new = rotated.json()["refresh_token"]
+    await redis_repo.remove_by_key(grace._key(old))
+
+    reused = await _refresh(client, old)
+
+    assert reused.status_code == 401
+    assert await sessions.find_one_or_none_token(refresh_token=new) is None
+    assert await _user_tokens(redis_repo) == set()
+
+
+async def test_follower_timeout_does_not_rotate(
+    client, uow, sessions, grace, redis_repo
+):
+    old = await _login(sessions)
+    # a leader that never finishes
+    await redis_repo.redis.set(grace._key(old), grace.PENDING)
+
+    response = await _refresh(client, old)
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    assert await sessions.find_one_or_none_token(refresh_token=old)
+    assert grace.wait_timeouts == 1
+
+
+async def test_unreadable_pair_does_not_rotate(
+    client, uow, sessions, grace, redis_repo
+):
+    old = await _login(sessions)
+    await redis_repo.redis.set(grace._key(old), b"\xffnot a pair")
+
+    response = await _refresh(client, old)
+
+    assert response.status_code == 409
+    assert await sessions.find_one_or_none_token(refresh_token=old)
+    assert grace.wait_errors == 1
+
+
+async def test_redis_error_while_waiting_does_not_rotate(
+    client, uow, sessions, grace, redis_repo, monkeypatch
+):
+    old = await _login(sessions)
+    await redis_repo.redis.set(grace._key(old), grace.PENDING)
+    monkeypatch.setattr(
+        redis_repo.redis, "get", AsyncMock(side_effect=RedisError)
+    )
+
+    response = await _refresh(client, old)
+
+    assert response.status_code == 409
+    assert grace.wait_errors == 1
+    monkeypatch.undo()
+    assert await sessions.find_one_or_none_token(refresh_token=old)
+
+
+async def test_claim_outlives_window_and_rotation(grace, redis_repo):
+    old = str(uuid.uuid4())
+    assert await grace.claim(old)
+    # window 0.5 + rotation timeout 1, rounded up
+    assert await redis_repo.redis.ttl(grace._key(old)) == 2
+
+
+async def test_slow_rotation_is_cut_off(
+    client, uow, sessions, grace, monkeypatch
+):
+    old = await _login(sessions)
+
+    async def stuck(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(sessions, "rotate_token", stuck)
+    monkeypatch.setattr(grace, "rotation_timeout", 0.05)
+
+    response = await _refresh(client, old)
+
+    assert response.status_code == 409
+    assert not await grace._redis.redis.exists(grace._key(old))
+
+
+async def test_failed_leader_lets_a_follower_rotate(
+    client, uow, sessions, grace
+):
+    old = await _login(sessions)
+    assert await grace.claim(old)
+    await grace.release(old)
+
+    response = await _refresh(client, old)
+
+    assert response.status_code == 200
+
+
+async def test_unknown_token_is_rejected(client, uow):
+    response = await _refresh(client, str(uuid.uuid4()))
+    assert response.status_code == 401
+
+
+async def test_reuse_of_an_older_token_revokes_the_family(sessions):
+    first = await _login(sessions)
+    second, third = uuid.uuid4(), uuid.uuid4()
+    assert await sessions.rotate_token(first, second, 3600)
+    assert await sessions.rotate_token(str(second), third, 3600)
+
+    (revoked,) = await sessions.revoke_token_family(first)
+
+    assert revoked.refresh_token == third
+    assert await sessions.find_one_or_none_token(refresh_token=third) is None
+
+
+async def test_only_one_concurrent_rotation_wins(sessions):
+    old = await _login(sessions)
+
+    rotations = await asyncio.gather(
+        *(
+            sessions.rotate_token(old, uuid.uuid4(), 3600)
+            for _ in range(10)
+        )
+    )
+
+    assert sum(r is not None for r in rotations) == 1
+
+
+async def test_sessions_are_found_by_each_supported_field(sessions):
+    token = await _login(sessions)
+    session = await sessions.find_one_or_none_token(refresh_token=token)
+
+    for field in ("id", "family_id", "user_id"):
+        found = await sessions.find_one_or_none_token(
+            **{field: getattr(session, field)}
+        )
+        assert found == session
+
+
+@pytest.mark.parametrize(
+    "filter_by", [{"access_token": "x"}, {"id": 1, "user_id": USER_ID}, {}]
+)
+async def test_unsupported_filters_are_a_repository_error(
+    sessions, filter_by
+):
+    with pytest.raises(UnsupportedSessionFilterException):
+        await sessions.find_one_or_none_token(**filter_by)
@@ -0,0 +1,15 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from src.database.all_models import UserORM
+from src.app.utils.repository import ExplainJSON
+
+
+def test_explain_keeps_values_bound():
+    stmt = select(UserORM).filter_by(login="a:b' OR '1'='1")
+    compiled = ExplainJSON(stmt).compile(dialect=postgresql.dialect())
+
+    sql = str(compiled)
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "a:b" not in sql
+    assert list(compiled.params.values()) == ["a:b' OR '1'='1"]
@@ -0,0 +1,92 @@
+import uuid
+
+import pytest
+from fastapi import Response
+from fastapi_cache import FastAPICache
+from starlette.requests import Request
+
+from src.app.schemas.auth import User
+from src.app.schemas.types import UserRole
+from src.app.utils.response_cache import (
+    cache_user_response,
+    init_response_cache,
+    invalidate_user_responses,
+)
+from src.app.utils.static.auth_crypto import TokenUtils
+
+
+USER_ID = uuid.uuid4()
+FASTAPI_CACHE_STATE = (
+    "_backend",
+    "_prefix",
+    "_expire",
+    "_init",
+    "_coder",
+    "_key_builder",
+    "_enable",
+)
+
+
+@pytest.fixture
+def uninitialised(monkeypatch) -> None:
+    monkeypatch.setattr(FastAPICache, "_backend", None)
+
+
+@pytest.fixture
+def initialised(redis_repo, monkeypatch) -> None:
+    # restored after the test, FastAPICache is process-wide
+    for attr in FASTAPI_CACHE_STATE:
+        value = getattr(FastAPICache, attr, None)
+        monkeypatch.setattr(FastAPICache, attr, value, raising=False)
+    init_response_cache(redis_repo)
+
+
+def _request() -> Request:
+    token = TokenUtils.create_access_token(
+        USER_ID, UserRole.SuperUserRole, True
+    )
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/user/me",
+            "query_string": b"",
+            "headers": [(b"cookie", f"access_token=Bearer {token}".encode())],
+        }
+    )
+
+
+@cache_user_response(namespace="user:me")
+async def get_me(request: Request, response: Response, uow=None) -> User:
+    return User(
+        id=USER_ID,
+        login="alice",
+        role=UserRole.SuperUserRole,
+        is_active=True,
+        hashed_password="$2b$12$hash",
+    )
+
+
+async def test_entries_carry_no_password_hash(initialised, redis_repo):
+    result = await get_me(request=_request(), response=Response())
+
+    assert "hashed_password" not in result
+    (key,) = await redis_repo.redis.keys("fastapi-cache:user:me:*")
+    assert b"hashed_password" not in await redis_repo.redis.get(key)
+
+
+async def test_invalidation_drops_tagged_entries(initialised, redis_repo):
+    await get_me(request=_request(), response=Response())
+
+    await invalidate_user_responses(str(USER_ID))
+
+    assert await redis_repo.redis.dbsize() == 0
+
+
+async def test_uninitialised_cache_is_bypassed(uninitialised):
+    user = await get_me(request=_request(), response=Response())
+    assert user.id == USER_ID
+
+
+async def test_uninitialised_invalidation_is_a_noop(uninitialised):
+    await invalidate_user_responses(USER_ID)
@@ -0,0 +1,109 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from src.app.api.v1.user import router
+from src.app.utils import unitofwork as unitofwork_module
+from src.app.utils.single_flight import REPLICA_KEY
+from src.app.utils.unitofwork import (
+    IUnitOfWork,
+    UnitOfWork,
+    get_read_uow,
+    get_read_your_writes_uow,
+)
+
+
+def _accessor() -> MagicMock:
+    accessor = MagicMock()
+    for maker in ("get_async_session_maker", "get_read_session_maker"):
+        session = MagicMock()
+        session.info = {}
+        getattr(accessor, maker).return_value = lambda s=session: s
+    return accessor
+
+
+async def _enter(**kwargs) -> tuple[UnitOfWork, MagicMock]:
+    accessor = _accessor()
+    uow = UnitOfWork(accessor, **kwargs)
+    await uow.__aenter__()
+    return uow, accessor
+
+
+async def test_read_only_goes_to_replica():
+    uow, accessor = await _enter(read_only=True)
+    accessor.get_read_session_maker.assert_called_once()
+    accessor.get_async_session_maker.assert_not_called()
+    assert uow.session.info[REPLICA_KEY] is True
+
+
+async def test_read_your_writes_goes_to_primary():
+    uow, accessor = await _enter(read_only=True, read_your_writes=True)
+    accessor.get_async_session_maker.assert_called_once()
+    accessor.get_read_session_maker.assert_not_called()
+    assert uow.session.info[REPLICA_KEY] is False
+
+
+async def test_writes_go_to_primary():
+    uow, accessor = await _enter()
+    accessor.get_async_session_maker.assert_called_once()
+    assert uow.session.info[REPLICA_KEY] is False
+
+
+def _uow_dependency(path: str, method: str):
+    for route in router.routes:
+        if route.path == path and method in route.methods:
+            return next(
+                d.call
+                for d in route.dependant.dependencies
+                if d.name == "uow"
+            )
+    raise LookupError(f"{method} {path}")
+
+
+def test_own_profile_reads_its_writes():
+    assert _uow_dependency("/user/me", "GET") is get_read_your_writes_uow
+
+
+def test_other_users_read_from_replica():
+    assert _uow_dependency("/user/{user_id}", "GET") is get_read_uow
+
+
+async def test_parallel_requests_get_their_own_session(monkeypatch):
+    sessions = []
+
+    def new_session() -> MagicMock:
+        session = MagicMock()
+        session.info = {}
+        session.rollback = AsyncMock()
+        session.close = AsyncMock()
+        sessions.append(session)
+        return session
+
+    accessor = MagicMock()
+    accessor.get_async_session_maker.return_value = new_session
+    monkeypatch.setattr(unitofwork_module, "database_accessor", accessor)
+
+    probe = FastAPI()
+
+    @probe.get("/probe/{n}")
+    async def handler(n: int, uow: IUnitOfWork = Depends(get_uow)):
+        async with uow:
+            uow.session.info["request"] = n
+            # let the other requests enter before this one reads back
+            await asyncio.sleep(0.01)
+            return {"request": uow.session.info["request"]}
+
+    transport = httpx.ASGITransport(app=probe)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="https://test"
+    ) as client:
+        responses = await asyncio.gather(
+            *(client.get(f"/probe/{n}") for n in range(500))
+        )
+
+    assert [r.json()["request"] for r in responses] == list(range(500))
+    assert len({id(session) for session in sessions}) == 500
+    for session in sessions:
+        session.close.assert_awaited_once()
@@ -0,0 +1,101 @@
+import uuid
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.app.repositories.exceptions import InvalidCursorException
+from src.app.repositories.metauser.auth_user import (
+    AuthRepository,
+    decode_cursor,
+    encode_cursor,
+)
+from src.app.schemas.auth import PaginateSchema, UsersFindRequest
+from src.app.schemas.types import UserRole
+
+
+def _row(day: int) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "login": f"user_{day}",
+        "role": UserRole.ClientRole,
+        "is_active": True,
+        "creation_date": date(2026, 1, day),
+    }
+
+
+def _session(rows: list[dict]) -> MagicMock:
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = rows
+    session = MagicMock()
+    session.info = {}
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+def _params(session: MagicMock) -> list:
+    (stmt,), _ = session.execute.call_args
+    return list(stmt.compile(dialect=postgresql.dialect()).params.values())
+
+
+def _cursor_request(cursor=None, limit=2) -> UsersFindRequest:
+    return UsersFindRequest(
+        paginate=PaginateSchema(mode="cursor", cursor=cursor, limit=limit)
+    )
+
+
+def test_cursor_round_trip():
+    user_id = uuid.uuid4()
+    cursor = encode_cursor(date(2026, 10, 18), user_id)
+    assert decode_cursor(cursor) == (date(2026, 10, 18), user_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "not base64!", "bnVsbA==", "WyIyMDI2LTEwLTE4Il0=", "WzEsIDJd"],
+)
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor)
+
+
+async def test_next_page_seeks_past_the_last_row():
+    rows = [_row(1), _row(2), _row(3)]
+    session = _session(rows)
+    repository = AuthRepository(session)
+
+    first = await repository.find_all_users(_cursor_request())
+    assert [u.id for u in first.items] == [r["id"] for r in rows[:2]]
+    assert first.next_cursor is not None
+
+    session.execute.return_value.mappings.return_value.all.return_value = (
+        rows[2:]
+    )
+    second = await repository.find_all_users(
+        _cursor_request(first.next_cursor)
+    )
+    params = _params(session)
+    assert rows[1]["creation_date"] in params
+    assert rows[1]["id"] in params
+    assert [u.id for u in second.items] == [rows[2]["id"]]
+    assert second.next_cursor is None
+
+
+async def test_last_full_page_has_no_cursor():
+    session = _session([_row(1), _row(2)])
+    page = await AuthRepository(session).find_all_users(_cursor_request())
+    assert len(page.items) == 2
+    assert page.next_cursor is None
+
+
+async def test_cursor_page_seeks_instead_of_offsetting():
+    session = _session([])
+    await AuthRepository(session).find_all_users(_cursor_request(limit=5))
+
+    (stmt,), _ = session.execute.call_args
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "OFFSET" not in sql
+    assert "ORDER BY auth_user.creation_date, auth_user.id" in sql
+    # one extra row tells whether there is a next page
+    assert 6 in _params(session)
@@ -0,0 +1,65 @@
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.app.repositories.metauser import auth_user as auth_user_module
+from src.app.repositories.metauser.auth_user import AuthRepository
+from src.app.schemas.auth import UserBatchItem, UserBulkResult, User
+from src.app.schemas.types import UserRole
+from src.app.utils.user_cache import UserCache
+
+
+def _row() -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "login": "alice",
+        "role": UserRole.ClientRole,
+        "is_active": True,
+    }
+
+
+@pytest.fixture
+def cache(monkeypatch) -> UserCache:
+    cache = UserCache(max_size=10, local_ttl=60, redis_ttl=60)
+    monkeypatch.setattr(auth_user_module, "user_cache", cache)
+    return cache
+
+
+async def test_cache_hit_and_miss_return_the_same_user(cache):
+    row = _row()
+    result = MagicMock()
+    result.mappings.return_value.one_or_none.return_value = row
+    session = MagicMock()
+    session.info = {}
+    session.execute = AsyncMock(return_value=result)
+    repository = AuthRepository(session)
+
+    miss = await repository.find_one_or_none_user(id=row["id"])
+    hit = await repository.find_one_or_none_user(id=row["id"])
+
+    assert session.execute.await_count == 1
+    assert hit == miss
+    assert miss.hashed_password is None
+    (stmt,), _ = session.execute.call_args
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "hashed_password" not in sql
+
+
+def test_cache_never_keeps_a_hash(cache):
+    user = User(**_row(), hashed_password="$2b$12$hash")
+    assert cache._strip(user).hashed_password is None
+
+
+@pytest.mark.parametrize(
+    "schema, fields",
+    [
+        (UserBatchItem, {"found": True}),
+        (UserBulkResult, {"status": "updated"}),
+    ],
+)
+def test_responses_leave_the_hash_out(schema, fields):
+    user = User(**_row(), hashed_password="$2b$12$hash")
+    dumped = schema(id=user.id, user=user, **fields).model_dump(mode="json")
+    assert "hashed_password" not in dumped["user"]
@@ -0,0 +1,55 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import Response
+
+from src.app.schemas.types import UserRole
+from src.app.services import user as user_service
+from src.app.services.user import UserService
+from src.app.utils.static.auth_crypto import TokenUtils
+
+
+USER_ID = uuid.uuid4()
+
+
+class FakeUnitOfWork:
+    def __init__(self):
+        self.auth = MagicMock()
+        self.auth.find_one_or_none_user = AsyncMock(
+            return_value=SimpleNamespace(
+                id=USER_ID, role=UserRole.ClientRole, is_active=True
+            )
+        )
+        self.auth.activeness_switcher = AsyncMock(return_value=True)
+        self.token = MagicMock()
+        self.token.find_one_or_none_token = AsyncMock(return_value=None)
+        self.token.logout_delete_token = AsyncMock()
+        self.commit = AsyncMock()
+
+    async def __aenter__(self) -> "FakeUnitOfWork":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+async def test_deleting_yourself_without_a_session(monkeypatch):
+    monkeypatch.setattr(
+        TokenUtils,
+        "token_user_dependency",
+        AsyncMock(return_value=SimpleNamespace(user_id=USER_ID)),
+    )
+    monkeypatch.setattr(
+        user_service, "invalidate_user_responses", AsyncMock()
+    )
+    uow = FakeUnitOfWork()
+
+    deleted = await UserService.delete_current_user(
+        Response(), MagicMock(cookies={}), uow
+    )
+
+    assert deleted is True
+    uow.token.logout_delete_token.assert_not_awaited()
+    uow.auth.activeness_switcher.assert_awaited_once_with(USER_ID, False)
+    uow.commit.assert_awaited_once()